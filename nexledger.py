@@ -8,6 +8,7 @@ from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, QH
                              QCheckBox, QSpinBox)
 from PyQt6.QtCore import Qt, QDate
 from PyQt6.QtGui import QFont, QIcon, QPalette
+import numpy as np
 import pyqtgraph as pg
 from pyqtgraph import PlotWidget
 
@@ -24,19 +25,32 @@ def init_db():
             type TEXT NOT NULL CHECK(type IN ('Income', 'Expense'))
         )
     ''')
+    # covers the dashboard's per-date and total sums without touching the table
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_tx_date_type ON transactions(date, type, amount)')
     conn.commit()
     conn.close()
 
 # Fetch transactions for dashboard/chart
 def get_transactions_summary():
+    """Returns (epoch seconds, net amount) arrays, one point per transaction date."""
     conn = sqlite3.connect('nexledger.db')
     cursor = conn.cursor()
-    cursor.execute('SELECT date, SUM(amount) FROM transactions WHERE type=? GROUP BY date', ('Income',))
-    income = {row[0]: row[1] for row in cursor.fetchall()}
-    cursor.execute('SELECT date, SUM(amount) FROM transactions WHERE type=? GROUP BY date', ('Expense',))
-    expense = {row[0]: -row[1] for row in cursor.fetchall()}
+    # SQLite converts the date to an epoch and nets income against expenses per day
+    cursor.execute("""
+        SELECT CAST(strftime('%s', date) AS INTEGER) AS ts,
+               COALESCE(SUM(amount) FILTER (WHERE type='Income'), 0)
+                 - COALESCE(SUM(amount) FILTER (WHERE type='Expense'), 0) AS net
+        FROM transactions
+        WHERE date IS NOT NULL
+        GROUP BY date
+        ORDER BY date
+    """)
+    rows = cursor.fetchall()
     conn.close()
-    return {**income, **expense}
+    if not rows:
+        return np.empty(0), np.empty(0)
+    ts, net = zip(*rows)
+    return np.asarray(ts, dtype=float), np.asarray(net, dtype=float)
 
 # Main Application Class
 class NexLedger(QMainWindow):
@@ -112,7 +126,7 @@ class NexLedger(QMainWindow):
         layout.addLayout(summary_layout)
 
         # Chart
-        self.chart_widget = PlotWidget()
+        self.chart_widget = PlotWidget(axisItems={'bottom': pg.DateAxisItem()})
         self.chart_widget.setBackground('w')
         self.chart_widget.addLegend()
         layout.addWidget(self.chart_widget)
@@ -296,28 +310,28 @@ class NexLedger(QMainWindow):
             self.table.setItem(i, 3, QTableWidgetItem(row[3]))
 
     def update_dashboard(self):
-        data = get_transactions_summary()
-        if not data:
+        dates, net_data = get_transactions_summary()
+        if not len(dates):
             return
 
-        dates = sorted(data.keys())
-        income_data = [data.get(d, 0) for d in dates if data[d] > 0]
-        expense_data = [abs(data.get(d, 0)) for d in dates if data[d] < 0]
-        net_data = [data[d] for d in dates]
-
-        # Clear previous plots
-        self.chart_widget.clear()
-
-        # Plot net balance
-        self.chart_widget.plot(dates, net_data, pen='g', name='Net Balance', symbol='o')
+        # Redraw with auto-range and repaints held until the new curve is in place
+        vb = self.chart_widget.getViewBox()
+        vb.disableAutoRange()
+        self.chart_widget.setUpdatesEnabled(False)
+        try:
+            self.chart_widget.clear()
+            self.chart_widget.addItem(pg.PlotDataItem(dates, net_data, pen='g', name='Net Balance', symbol='o'))
+        finally:
+            vb.enableAutoRange()
+            self.chart_widget.setUpdatesEnabled(True)
+            self.chart_widget.update()
 
         # Summary totals
         conn = sqlite3.connect('nexledger.db')
         cursor = conn.cursor()
-        cursor.execute('SELECT SUM(amount) FROM transactions WHERE type=?', ('Income',))
-        total_income = cursor.fetchone()[0] or 0
-        cursor.execute('SELECT SUM(amount) FROM transactions WHERE type=?', ('Expense',))
-        total_expense = cursor.fetchone()[0] or 0
+        cursor.execute("SELECT COALESCE(SUM(amount) FILTER (WHERE type='Income'), 0), "
+                       "COALESCE(SUM(amount) FILTER (WHERE type='Expense'), 0) FROM transactions")
+        total_income, total_expense = cursor.fetchone()
         net = total_income - total_expense
         conn.close()
 
@@ -13,21 +13,34 @@
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
     QHeaderView, QFrame, QFileDialog, QMessageBox, QDialog, QFormLayout, QLineEdit,
-    QSpinBox, QComboBox, QDateEdit, QTabWidget, QTextEdit, QSplitter, QInputDialog
+    QSpinBox, QComboBox, QDateEdit, QTabWidget, QTextEdit, QSplitter, QInputDialog, QTableView,
+    QStyledItemDelegate
 )
-from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtCore import Qt, QDate, QAbstractTableModel, QModelIndex
 from shared.db import get_conn, get_conn_safe, get_current_company, log_audit
 from shared.theme import get_widget_style, EMERALD, GOLD
+from contextlib import contextmanager
 from datetime import datetime
 import csv
 import io
+import json
+import os
 import sqlite3
 import xml.etree.ElementTree as ET
 
+try:
+    import ahocorasick
+    AHOCORASICK_AVAILABLE = True
+except ImportError:
+    AHOCORASICK_AVAILABLE = False
+
+PANDAS_CSV_THRESHOLD = 5 << 20    # 5 MB
+
 # ----------------------- Helpers & Migration -----------------------
 
 def ensure_bank_tables(conn):
     cur = conn.cursor()
+    had_match_index = cur.execute("SELECT 1 FROM sqlite_master WHERE type='index' AND name='ix_cashbook_match'").fetchone() is not None
     cur.executescript('''
         CREATE TABLE IF NOT EXISTS bank_accounts (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -105,24 +118,73 @@ def ensure_bank_tables(conn):
             payload TEXT,
             created_at TEXT DEFAULT (datetime('now'))
         );
+
+        -- Auto-match / undo lookups
+        CREATE INDEX IF NOT EXISTS ix_cashbook_match ON cash_book(account, date, debit, credit, reconciled);
+        CREATE INDEX IF NOT EXISTS ix_bsl_matched ON bank_statement_lines(matched_entry_id);
     ''')
+    if not had_match_index:
+        # refresh planner statistics once so the new indexes get picked up
+        cur.execute('ANALYZE')
     conn.commit()
 
 # ----------------------- Small utilities -----------------------
 
+# Compiled rules are cached per company and rebuilt whenever the version moves.
+_rules_version = 0
+_rules_cache = {'key': None, 'matcher': None}
+
+def invalidate_rules_cache():
+    global _rules_version
+    _rules_version += 1
+
+def _compile_rules(rules):
+    # rules arrive ordered by id; the lowest id wins when several patterns match
+    always = None
+    if AHOCORASICK_AVAILABLE:
+        automaton = ahocorasick.Automaton()
+        for rid, pattern, action in rules:
+            pat = (pattern or '').lower()
+            if not pat:
+                always = always or (rid, action)
+            elif pat not in automaton:
+                automaton.add_word(pat, (rid, action))
+        if len(automaton):
+            automaton.make_automaton()
+        else:
+            automaton = None
+        return 'ac', automaton, always
+    compiled = [(rid, (pattern or '').lower(), action) for rid, pattern, action in rules]
+    return 'scan', compiled, always
+
 def apply_rules_to_description(conn, description):
     # returns action string or None
-    cur = conn.cursor()
-    cur.execute("SELECT id, pattern, action FROM bank_rules WHERE enabled=1 ORDER BY id ASC")
-    for rid, pattern, action in cur.fetchall():
-        try:
-            if pattern.lower() in (description or '').lower():
-                return action
-        except Exception:
-            continue
-    return None
+    key = (get_current_company(), _rules_version)
+    if _rules_cache['key'] != key:
+        cur = conn.cursor()
+        cur.execute("SELECT id, pattern, action FROM bank_rules WHERE enabled=1 ORDER BY id ASC")
+        _rules_cache['matcher'] = _compile_rules(cur.fetchall())
+        _rules_cache['key'] = key
+    kind, matcher, always = _rules_cache['matcher']
+    text = (description or '').lower()
+    best = always
+    if kind == 'ac':
+        if matcher is not None:
+            for _end, hit in matcher.iter(text):
+                if best is None or hit[0] < best[0]:
+                    best = hit
+    else:
+        for rid, pat, action in matcher:
+            if pat in text:
+                if best is None or rid < best[0]:
+                    best = (rid, action)
+                break
+    return best[1] if best else None
 
 def push_undo(conn, action, payload):
+    # payload is stored as JSON so free-text fields (fitid, narration) round-trip safely
+    if not isinstance(payload, str):
+        payload = json.dumps(payload)
     cur = conn.cursor()
     cur.execute('INSERT INTO bank_undo (action, payload) VALUES (?,?)', (action, payload))
     conn.commit()
@@ -136,6 +198,102 @@ def pop_undo(conn):
     conn.commit()
     return row[1], row[2]
 
+def decode_undo_payload(payload):
+    try:
+        return json.loads(payload)
+    except (TypeError, ValueError):
+        # legacy rows written as 'a|||b|||c'
+        return payload.split('|||')
+
+# ----------------------- Table model -----------------------
+
+class RowsTableModel(QAbstractTableModel):
+    """Read-only model over a list of row tuples; used instead of per-cell QTableWidgetItems."""
+    def __init__(self, headers, rows=None, parent=None):
+        super().__init__(parent)
+        self._headers = list(headers)
+        self._rows = list(rows or [])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self._rows[index.row()][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return None
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def append_row(self, row):
+        n = len(self._rows)
+        self.beginInsertRows(QModelIndex(), n, n)
+        self._rows.append(tuple(row))
+        self.endInsertRows()
+
+class AmountDelegate(QStyledItemDelegate):
+    """Formats numeric EditRole data for display so cells sort as numbers."""
+    def displayText(self, value, locale):
+        try:
+            return locale.toString(float(value), 'f', 2)
+        except (TypeError, ValueError):
+            return str(value or '')
+
+def amount_item(value):
+    item = QTableWidgetItem()
+    try:
+        item.setData(Qt.ItemDataRole.EditRole, float(value))
+    except (TypeError, ValueError):
+        item.setData(Qt.ItemDataRole.EditRole, 0.0)
+    return item
+
+def item_amount(item):
+    if item is None:
+        return 0.0
+    try:
+        return float(item.data(Qt.ItemDataRole.EditRole) or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+@contextmanager
+def bulk_fill(tbl):
+    """Suspend sorting, signals and repaints while a QTableWidget is populated."""
+    sorting = tbl.isSortingEnabled()
+    tbl.setUpdatesEnabled(False); tbl.setSortingEnabled(False); tbl.blockSignals(True)
+    try:
+        yield tbl
+    finally:
+        tbl.blockSignals(False); tbl.setSortingEnabled(sorting); tbl.setUpdatesEnabled(True)
+        tbl.viewport().update()
+
+# ----------------------- CSV reader -----------------------
+
+def read_statement_csv(path):
+    """Returns the rows of a bank statement CSV as a list of dicts keyed by header.
+    Large files go through pandas' C parser when it is installed; pandas is only
+    imported then, so opening the tab does not pay for it.
+    """
+    if os.path.getsize(path) > PANDAS_CSV_THRESHOLD:
+        try:
+            import pandas as pd
+        except ImportError:
+            pd = None
+        if pd is not None:
+            df = pd.read_csv(path, dtype=str, keep_default_na=False, encoding='utf-8', engine='c')
+            return df.to_dict('records')
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
 # ----------------------- OFX basic parser -----------------------
 
 def parse_basic_ofx(xml_text):
@@ -416,7 +574,7 @@ class CashBookTab(QWidget):
                 cur = conn.cursor();
                 # save previous snapshot to undo
                 cur.execute('SELECT date,narration,reference,debit,credit FROM cash_book WHERE id=?', (cid,)); prev = cur.fetchone()
-                push_undo(conn, 'edit_cashbook', f"{cid}|||{prev[0]}|||{prev[1]}|||{prev[2]}|||{prev[3]}|||{prev[4]}")
+                push_undo(conn, 'edit_cashbook', {'id': cid, 'date': prev[0], 'narration': prev[1], 'reference': prev[2], 'debit': prev[3], 'credit': prev[4]})
                 cur.execute('UPDATE cash_book SET date=?, narration=?, reference=?, debit=?, credit=? WHERE id=?', (dt, narr.text().strip(), ref.text().strip(), d, c, cid)); conn.commit()
             dlg.accept(); self.load_transactions_for_selected_account(); log_audit('Cashbook entry edited')
         except Exception as e:
@@ -434,8 +592,11 @@ class CashBookTab(QWidget):
                     cid = int(payload)
                     cur = conn.cursor(); cur.execute('DELETE FROM cash_book WHERE id=?', (cid,)); conn.commit(); QMessageBox.information(self,'Undo','Last inserted cashbook entry removed')
                 elif action == 'edit_cashbook':
-                    parts = payload.split('|||')
-                    cid = int(parts[0]); dt, narr, ref, d, c = parts[1], parts[2], parts[3], parts[4], parts[5]
+                    obj = decode_undo_payload(payload)
+                    if isinstance(obj, dict):
+                        cid = int(obj['id']); dt, narr, ref, d, c = obj['date'], obj['narration'], obj['reference'], obj['debit'], obj['credit']
+                    else:
+                        cid = int(obj[0]); dt, narr, ref, d, c = obj[1], obj[2], obj[3], obj[4], obj[5]
                     cur = conn.cursor(); cur.execute('UPDATE cash_book SET date=?, narration=?, reference=?, debit=?, credit=? WHERE id=?', (dt, narr, ref, d, c, cid)); conn.commit(); QMessageBox.information(self,'Undo','Last edit reverted')
                 else:
                     QMessageBox.information(self,'Undo','Unknown undo action')
@@ -492,9 +653,7 @@ class CashBookTab(QWidget):
         path, _ = QFileDialog.getOpenFileName(self,'Load CSV','', 'CSV Files (*.csv)')
         if not path: return
         try:
-            with open(path, newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
+            rows = read_statement_csv(path)
             self.import_preview.setRowCount(len(rows))
             for r,row in enumerate(rows):
                 date = row.get('Date') or row.get('date') or row.get('Transaction Date') or ''
@@ -580,6 +739,9 @@ class CashBookTab(QWidget):
 
         self.rec_left = QTableWidget(); self.rec_left.setColumnCount(4); self.rec_left.setHorizontalHeaderLabels(['Date','Description','Amount','FITID'])
         self.rec_right = QTableWidget(); self.rec_right.setColumnCount(6); self.rec_right.setHorizontalHeaderLabels(['Date','Narration','Ref','Debit','Credit','Matched'])
+        self._amount_delegate = AmountDelegate(self)
+        self.rec_left.setItemDelegateForColumn(2, self._amount_delegate)
+        self.rec_right.setItemDelegateForColumn(3, self._amount_delegate); self.rec_right.setItemDelegateForColumn(4, self._amount_delegate)
 
         splitter = QSplitter(Qt.Orientation.Horizontal)
         left_frame = QFrame(); lf_layout = QVBoxLayout(left_frame); lf_layout.addWidget(QLabel('Bank Statement'))
@@ -603,33 +765,33 @@ class CashBookTab(QWidget):
         path, _ = QFileDialog.getOpenFileName(self,'Load Bank Statement CSV','', 'CSV (*.csv)')
         if not path: return
         try:
-            with open(path, newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f)
-                rows = list(reader)
-            self.rec_left.setRowCount(len(rows))
-            for r,row in enumerate(rows):
-                d = row.get('Date') or row.get('date')
-                desc = row.get('Description') or row.get('Payee')
-                amt = row.get('Amount') or row.get('amount')
-                fitid = row.get('FITID') or ''
-                self.rec_left.setItem(r,0,QTableWidgetItem(str(d)))
-                self.rec_left.setItem(r,1,QTableWidgetItem(str(desc)))
-                self.rec_left.setItem(r,2,QTableWidgetItem(str(amt)))
-                self.rec_left.setItem(r,3,QTableWidgetItem(str(fitid)))
+            rows = read_statement_csv(path)
+            with bulk_fill(self.rec_left):
+                self.rec_left.setRowCount(len(rows))
+                for r,row in enumerate(rows):
+                    d = row.get('Date') or row.get('date')
+                    desc = row.get('Description') or row.get('Payee')
+                    amt = row.get('Amount') or row.get('amount')
+                    fitid = row.get('FITID') or ''
+                    self.rec_left.setItem(r,0,QTableWidgetItem(str(d)))
+                    self.rec_left.setItem(r,1,QTableWidgetItem(str(desc)))
+                    self.rec_left.setItem(r,2,amount_item(amt))
+                    self.rec_left.setItem(r,3,QTableWidgetItem(str(fitid)))
             aid = self.rec_account.currentData()
             if not aid: return
             with get_conn() as conn:
                 cur = conn.cursor(); cur.execute('SELECT id,date,narration,reference,debit,credit,reconciled FROM cash_book WHERE account=? ORDER BY date ASC', (str(aid),))
                 rows = cur.fetchall()
-            self.rec_right.setRowCount(len(rows))
-            for r,row in enumerate(rows):
-                idd, date, narr, ref, debit, credit, rec = row
-                self.rec_right.setItem(r,0,QTableWidgetItem(str(date)))
-                self.rec_right.setItem(r,1,QTableWidgetItem(str(narr)))
-                self.rec_right.setItem(r,2,QTableWidgetItem(str(ref)))
-                self.rec_right.setItem(r,3,QTableWidgetItem(str(debit or '')))
-                self.rec_right.setItem(r,4,QTableWidgetItem(str(credit or '')))
-                self.rec_right.setItem(r,5,QTableWidgetItem('Yes' if rec else 'No'))
+            with bulk_fill(self.rec_right):
+                self.rec_right.setRowCount(len(rows))
+                for r,row in enumerate(rows):
+                    idd, date, narr, ref, debit, credit, rec = row
+                    self.rec_right.setItem(r,0,QTableWidgetItem(str(date)))
+                    self.rec_right.setItem(r,1,QTableWidgetItem(str(narr)))
+                    self.rec_right.setItem(r,2,QTableWidgetItem(str(ref)))
+                    self.rec_right.setItem(r,3,amount_item(debit or 0))
+                    self.rec_right.setItem(r,4,amount_item(credit or 0))
+                    self.rec_right.setItem(r,5,QTableWidgetItem('Yes' if rec else 'No'))
         except Exception as e:
             QMessageBox.critical(self,'Error',str(e))
 
@@ -637,11 +799,7 @@ class CashBookTab(QWidget):
         left_sel = self.rec_left.currentRow(); right_sel = self.rec_right.currentRow()
         if left_sel == -1 or right_sel == -1: QMessageBox.warning(self,'Select','Select a statement row and a ledger row to match'); return
         fitid = self.rec_left.item(left_sel,3).text() if self.rec_left.item(left_sel,3) else ''
-        amt_text = self.rec_left.item(left_sel,2).text() if self.rec_left.item(left_sel,2) else '0'
-        try:
-            amt = float(amt_text)
-        except:
-            amt = 0.0
+        amt = item_amount(self.rec_left.item(left_sel,2))
         with get_conn() as conn:
             cur = conn.cursor();
             rdate = self.rec_right.item(right_sel,0).text()
@@ -656,7 +814,7 @@ class CashBookTab(QWidget):
             cur.execute('UPDATE cash_book SET reconciled=1 WHERE id=?', (lid,))
             conn.commit()
             # push undo for match
-            push_undo(conn, 'match', f'{lid}|||{fitid}|||{amt}')
+            push_undo(conn, 'match', {'ids': [lid], 'fitids': [fitid], 'amts': [amt]})
         QMessageBox.information(self,'Matched','Statement line matched to ledger entry')
         self.refresh_all()
 
@@ -667,11 +825,13 @@ class CashBookTab(QWidget):
                 if not rec: QMessageBox.information(self,'Undo','Nothing to undo'); return
                 action, payload = rec
                 if action == 'match':
-                    parts = payload.split('|||')
-                    lid = int(parts[0]); fitid = parts[1]; amt = float(parts[2])
+                    obj = decode_undo_payload(payload)
+                    # one undo row covers a whole batch of matches
+                    ids = [int(i) for i in obj['ids']] if isinstance(obj, dict) else [int(obj[0])]
+                    marks = ','.join('?' * len(ids))
                     cur = conn.cursor();
-                    cur.execute('DELETE FROM bank_statement_lines WHERE matched_entry_id=?', (lid,))
-                    cur.execute('UPDATE cash_book SET reconciled=0 WHERE id=?', (lid,))
+                    cur.execute(f'DELETE FROM bank_statement_lines WHERE matched_entry_id IN ({marks})', ids)
+                    cur.execute(f'UPDATE cash_book SET reconciled=0 WHERE id IN ({marks})', ids)
                     conn.commit(); QMessageBox.information(self,'Undo','Last match undone')
                 else:
                     QMessageBox.information(self,'Undo','Last action not a match, cannot undo here')
@@ -691,10 +851,11 @@ class CashBookTab(QWidget):
         try:
             with get_conn() as conn:
                 cur = conn.cursor(); cur.execute('SELECT id,name,bank,account_no,opening_balance FROM bank_accounts'); rows = cur.fetchall()
-            self.manage_tbl.setRowCount(len(rows))
-            for r,row in enumerate(rows):
-                for c,val in enumerate(row): self.manage_tbl.setItem(r,c,QTableWidgetItem(str(val)))
-                btn = QPushButton('Edit'); btn.clicked.connect(lambda _, aid=row[0]: self.edit_bank_account(aid)); self.manage_tbl.setCellWidget(r,5,btn)
+            with bulk_fill(self.manage_tbl):
+                self.manage_tbl.setRowCount(len(rows))
+                for r,row in enumerate(rows):
+                    for c,val in enumerate(row): self.manage_tbl.setItem(r,c,QTableWidgetItem(str(val)))
+                    btn = QPushButton('Edit'); btn.clicked.connect(lambda _, aid=row[0]: self.edit_bank_account(aid)); self.manage_tbl.setCellWidget(r,5,btn)
         except Exception as e:
             print('load_manage_accounts', e)
 
@@ -739,30 +900,32 @@ class CashBookTab(QWidget):
     def open_rules_manager(self):
         dlg = QDialog(self); dlg.setWindowTitle('Bank Rules'); dlg.setFixedSize(600,400)
         layout = QVBoxLayout(dlg)
-        table = QTableWidget(); table.setColumnCount(4); table.setHorizontalHeaderLabels(['ID','Pattern','Action','Enabled']); layout.addWidget(table)
-        btn_row = QHBoxLayout(); btn_add = QPushButton('Add Rule'); btn_add.clicked.connect(lambda: self.add_rule(table)); btn_row.addWidget(btn_add); btn_row.addStretch(); layout.addLayout(btn_row)
+        model = RowsTableModel(['ID','Pattern','Action','Enabled'], parent=dlg)
+        table = QTableView(); table.setModel(model); layout.addWidget(table)
+        btn_row = QHBoxLayout(); btn_add = QPushButton('Add Rule'); btn_add.clicked.connect(lambda: self.add_rule(model)); btn_row.addWidget(btn_add); btn_row.addStretch(); layout.addLayout(btn_row)
         try:
             with get_conn() as conn:
                 cur = conn.cursor(); cur.execute('SELECT id,pattern,action,enabled FROM bank_rules'); rows = cur.fetchall()
-            table.setRowCount(len(rows))
-            for r,row in enumerate(rows):
-                table.setItem(r,0,QTableWidgetItem(str(row[0]))); table.setItem(r,1,QTableWidgetItem(row[1])); table.setItem(r,2,QTableWidgetItem(row[2])); table.setItem(r,3,QTableWidgetItem(str(bool(row[3]))))
+            model.set_rows((str(r[0]), r[1], r[2], str(bool(r[3]))) for r in rows)
         except Exception as e:
             print('rules load', e)
         dlg.exec()
 
-    def add_rule(self, table=None):
+    def add_rule(self, model=None):
         dlg = QDialog(self); dlg.setWindowTitle('Add Rule'); form = QFormLayout(dlg)
         pattern = QLineEdit(); action = QLineEdit(); enabled = QComboBox(); enabled.addItems(['1','0'])
         form.addRow('Pattern (contains):', pattern); form.addRow('Action (e.g. categorize:Bank Charges):', action); form.addRow('Enabled', enabled)
-        btn = QPushButton('Save'); btn.clicked.connect(lambda: self._save_rule(dlg, pattern, action, enabled, table)); form.addRow(btn); dlg.exec()
+        btn = QPushButton('Save'); btn.clicked.connect(lambda: self._save_rule(dlg, pattern, action, enabled, model)); form.addRow(btn); dlg.exec()
 
-    def _save_rule(self, dlg, pattern, action, enabled, table):
+    def _save_rule(self, dlg, pattern, action, enabled, model):
         try:
+            pat = pattern.text().strip(); act = action.text().strip(); en = int(enabled.currentText())
             with get_conn() as conn:
-                cur = conn.cursor(); cur.execute('INSERT INTO bank_rules (pattern, action, enabled) VALUES (?,?,?)', (pattern.text().strip(), action.text().strip(), int(enabled.currentText()))); conn.commit()
+                cur = conn.cursor(); cur.execute('INSERT INTO bank_rules (pattern, action, enabled) VALUES (?,?,?)', (pat, act, en)); rid = cur.lastrowid; conn.commit()
+            invalidate_rules_cache()
             dlg.accept(); QMessageBox.information(self,'Saved','Rule added')
-            if table: self.open_rules_manager()
+            # append to the open rules dialog instead of rebuilding it
+            if model is not None: model.append_row((str(rid), pat, act, str(bool(en))))
         except Exception as e:
             QMessageBox.critical(self,'Error',str(e))
 
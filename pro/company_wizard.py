@@ -10,8 +10,14 @@ from shared.db import create_company, set_current_company, get_conn, log_audit,
 
 
 class CompanySetupWizard(QWizard):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, main_window=None):
         super().__init__(parent)
+        current = parent
+        while main_window is None and current is not None:
+            if hasattr(current, 'refresh_all') and hasattr(current, 'company_label'):
+                main_window = current
+            current = current.parent()
+        self._main_window = main_window
         self.setWindowTitle("Nexled – New Company Setup Wizard")
         self.setWizardStyle(QWizard.WizardStyle.ModernStyle)
         self.setOption(QWizard.WizardOption.NoBackButtonOnStartPage, True)
@@ -248,17 +254,13 @@ class CompanySetupWizard(QWizard):
             self.apply_smart_setup(clean_name)
             log_audit(f"Created company: {clean_name} | Type: {self.result_data['business_type']}")
 
-            main_window = None
-            current = self.parent()
-            while current:
-                if hasattr(current, 'refresh_all') and hasattr(current, 'company_label'):
-                    main_window = current
-                    break
-                current = current.parent()
-
+            main_window = self._main_window
             if main_window:
                 main_window.company_label.setText(f"Company: {clean_name}")
-                main_window.refresh_all()
+                if hasattr(main_window, 'schedule_refresh'):
+                    main_window.schedule_refresh()
+                else:
+                    main_window.refresh_all()
 
             QMessageBox.information(self, "Success", f"Company '{clean_name}' created and ready!")
             super().accept()
@@ -8,18 +8,83 @@
 # - Safe DB checks (tables may not exist yet)
 
 import csv
-from functools import partial
+import re
+from itertools import groupby
+from operator import itemgetter
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget,
     QTableWidgetItem, QLineEdit, QHeaderView, QDialog, QFormLayout,
-    QMessageBox, QComboBox, QTextEdit, QSizePolicy, QSpinBox, QFileDialog, QFrame
+    QMessageBox, QComboBox, QTextEdit, QSizePolicy, QSpinBox, QFileDialog, QFrame,
+    QTableView, QAbstractItemView, QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
+)
+from PyQt6.QtCore import (
+    Qt, pyqtSignal, QAbstractTableModel, QModelIndex, QEvent, QRect, QTimer, QObject, QRunnable, QThreadPool
 )
-from PyQt6.QtCore import Qt, pyqtSignal
 from PyQt6.QtGui import QFont, QColor
 
-from shared.db import get_conn_safe
+from shared.db import get_pool, table_exists
 
 PAGE_SIZE = 25
+SEARCH_DEBOUNCE_MS = 250
+# bound once; avoids re-parsing the format spec for every cell
+_money = "R{:,.2f}".format
+LEDGER_HEADERS = ("Type", "Ref", "Date", "Amount", "Balance")
+
+# validation patterns, compiled once at import
+_EMAIL_RE = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
+_PHONE_RE = re.compile(r"^\+?\d{7,15}$")
+_PHONE_STRIP = str.maketrans("", "", " -()")
+# +1 numbers: area code and central-office code may not start with 0 or 1
+_NANP_RE = re.compile(r"^\+1([2-9]\d{2})([2-9]\d{2})(\d{4})$")
+
+
+_TX_CUSTOMER_ID_SQL = "CAST(substr({d}, instr({d}, 'cust:') + 5) AS INTEGER)"
+
+
+def ensure_customer_schema(conn, has_invoices=True, has_tx=True):
+    cur = conn.cursor()
+    # backs the name-ordered keyset paging; id is the rowid so it rides along in the index
+    cur.execute("CREATE INDEX IF NOT EXISTS ix_customers_name ON customers(name)")
+    if has_invoices:
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_invoices_customer ON invoices(customer_id, status, date)")
+    if has_tx:
+        # payments used to be linked only through a 'cust:N' tag in the description
+        cols = {r[1] for r in cur.execute("PRAGMA table_info(transactions)")}
+        if "customer_id" not in cols:
+            cur.execute("ALTER TABLE transactions ADD COLUMN customer_id INTEGER")
+            cur.execute(f"UPDATE transactions SET customer_id = {_TX_CUSTOMER_ID_SQL.format(d='description')} "
+                        "WHERE description LIKE '%cust:%'")
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_tx_customer_date ON transactions(customer_id, date)")
+        # keep the column filled whichever screen writes the transaction
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tx_customer_ins AFTER INSERT ON transactions
+            WHEN NEW.customer_id IS NULL AND NEW.description LIKE '%cust:%'
+            BEGIN
+                UPDATE transactions SET customer_id = {_TX_CUSTOMER_ID_SQL.format(d='NEW.description')}
+                WHERE id = NEW.id;
+            END
+        """)
+        # editing the description can add, change or drop the tag
+        cur.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_tx_customer_upd AFTER UPDATE OF description ON transactions
+            WHEN NEW.description IS NOT OLD.description
+                AND (NEW.description LIKE '%cust:%' OR OLD.description LIKE '%cust:%')
+            BEGIN
+                UPDATE transactions SET customer_id = CASE
+                    WHEN NEW.description LIKE '%cust:%' THEN {_TX_CUSTOMER_ID_SQL.format(d='NEW.description')}
+                    END
+                WHERE id = NEW.id;
+            END
+        """)
+    conn.commit()
+
+
+def iter_ledger_rows(items):
+    """Yields display rows with a running balance for (type, ref, date, amount) items."""
+    balance = 0
+    for typ, ref, date, amt in items:
+        balance += (amt or 0)
+        yield (typ, str(ref), str(date), _money(amt or 0), _money(balance))
 
 
 # -----------------------------
@@ -35,15 +100,8 @@ class CustomerEditor(QDialog):
         self.setMinimumWidth(460)
 
         layout = QVBoxLayout(self)
-        layout.setStretch(0, 0)  # header
-        layout.setStretch(1, 0)  # KPI row
-        layout.setStretch(2, 1)  # table (fills space)
-        layout.setStretch(3, 0)  # pager
         layout.setContentsMargins(12, 12, 12, 12)
         layout.setSpacing(8)
-        layout.setStretch(0, 0)
-        layout.setStretch(1, 0)
-        layout.setStretch(2, 1)
         form = QFormLayout()
 
         self.txt_name = QLineEdit()
@@ -77,24 +135,17 @@ class CustomerEditor(QDialog):
             self.load_customer()
 
     def load_customer(self):
-        conn = get_conn_safe()
-        if not conn:
+        pool = get_pool()
+        if not pool:
             return
-        try:
-            cur = conn.cursor()
+        with pool.read() as conn:
             # safe read
-            cur.execute("SELECT * FROM customers WHERE id=?", (self.customer_id,))
-            row = cur.fetchone()
-            if row:
-                self.txt_name.setText(row["name"] or "")
-                self.txt_email.setText(row["email"] or "")
-                self.txt_phone.setText(row["phone"] or "")
-                self.txt_address.setText(row["address"] or "")
-        finally:
-            try:
-                conn.close()
-            except:
-                pass
+            row = conn.execute("SELECT * FROM customers WHERE id=?", (self.customer_id,)).fetchone()
+        if row:
+            self.txt_name.setText(row["name"] or "")
+            self.txt_email.setText(row["email"] or "")
+            self.txt_phone.setText(row["phone"] or "")
+            self.txt_address.setText(row["address"] or "")
 
     def _show_error(self, text: str):
         self.err_label.setText(text)
@@ -115,39 +166,37 @@ class CustomerEditor(QDialog):
             self._show_error("Invalid phone number")
             return
 
-        conn = get_conn_safe()
-        if not conn:
+        pool = get_pool()
+        if not pool:
             QMessageBox.critical(self, "Error", "Database not ready")
             return
         try:
-            cur = conn.cursor()
-            if self.customer_id:
-                cur.execute("""
-                    UPDATE customers SET name=?, email=?, phone=?, address=?
-                    WHERE id=?
-                """, (name, email or None, phone or None, address or None, self.customer_id))
-            else:
-                cur.execute("""
-                    INSERT INTO customers(name, email, phone, address)
-                    VALUES (?,?,?,?)
-                """, (name, email or None, phone or None, address or None))
-            conn.commit()
+            with pool.write() as conn:
+                if self.customer_id:
+                    conn.execute("""
+                        UPDATE customers SET name=?, email=?, phone=?, address=?
+                        WHERE id=?
+                    """, (name, email or None, phone or None, address or None, self.customer_id))
+                else:
+                    conn.execute("""
+                        INSERT INTO customers(name, email, phone, address)
+                        VALUES (?,?,?,?)
+                    """, (name, email or None, phone or None, address or None))
             self.saved.emit()
             self.accept()
         except Exception as e:
             self._show_error(f"Save failed: {e}")
-        finally:
-            try:
-                conn.close()
-            except:
-                pass
 
     def _validate_email(self, email: str) -> bool:
-        return ("@" in email) and ("." in email)
+        return _EMAIL_RE.match(email) is not None
 
     def _validate_phone(self, phone: str) -> bool:
-        s = phone.replace(" ", "").replace("-", "")
-        return s.isdigit() or (s.startswith("+") and s[1:].isdigit())
+        s = phone.translate(_PHONE_STRIP)
+        if _PHONE_RE.match(s) is None:
+            return False
+        if s.startswith("+1"):
+            return _NANP_RE.match(s) is not None
+        return True
 
 
 # -----------------------------
@@ -157,6 +206,7 @@ class CustomerLedgerDialog(QDialog):
     def __init__(self, customer_id: int, parent=None):
         super().__init__(parent)
         self.customer_id = customer_id
+        self._items = []
         self.setWindowTitle(f"Customer Ledger - {customer_id}")
         self.setMinimumSize(700, 500)
         self.build_ui()
@@ -168,8 +218,8 @@ class CustomerLedgerDialog(QDialog):
         lay.addWidget(self.lbl_info)
 
         self.table = QTableWidget()
-        self.table.setColumnCount(5)
-        self.table.setHorizontalHeaderLabels(["ID", "Name", "Email", "Phone", "Outstanding", "Actions"])
+        self.table.setColumnCount(len(LEDGER_HEADERS))
+        self.table.setHorizontalHeaderLabels(LEDGER_HEADERS)
         self.table.horizontalHeader().setStretchLastSection(True)
         lay.addWidget(self.table)
 
@@ -180,75 +230,198 @@ class CustomerLedgerDialog(QDialog):
         btns.addWidget(export)
         lay.addLayout(btns)
 
-    def load_ledger(self):
-        conn = get_conn_safe()
-        if not conn:
-            return
-        try:
+    def _fetch_ledger_rows(self):
+        """Returns (customer name, formatted ledger rows with running balance)."""
+        pool = get_pool()
+        if not pool:
+            return None, []
+        with pool.read() as conn:
             cur = conn.cursor()
             # load customer name
             row = cur.execute("SELECT name FROM customers WHERE id=?", (self.customer_id,)).fetchone()
             name = row["name"] if row else f"Customer {self.customer_id}"
-            self.lbl_info.setText(f"Ledger for: {name}")
 
-            # collect invoices and payments (payments may be implemented as transactions)
-            items = []
+            # invoices and payments (payments are transactions) merged and ordered by SQLite
+            parts = []
             if self._table_exists(conn, "invoices"):
-                invs = cur.execute("SELECT id, date, total FROM invoices WHERE customer_id=? ORDER BY date",
-                                   (self.customer_id,)).fetchall()
-                for i in invs:
-                    items.append(("Invoice", i["id"], i["date"], i["total"]))
-            # payments (transactions table) - check table
+                parts.append("SELECT 'Invoice' AS typ, id, date, total FROM invoices WHERE customer_id=?")
             if self._table_exists(conn, "transactions"):
-                pays = cur.execute(
-                    "SELECT id, date, amount, description FROM transactions WHERE description LIKE ? ORDER BY date",
-                    (f"%cust:{self.customer_id}%",)).fetchall()
-                for p in pays:
-                    items.append(("Payment", p["id"], p["date"], p["amount"]))
-
-            # sort by date and compute running balance
-            items.sort(key=lambda x: x[2] or "")
-            balance = 0
-            self.table.setRowCount(len(items))
-            for r, it in enumerate(items):
-                typ, ref, date, amt = it
-                balance += (amt or 0)
-                self.table.setItem(r, 0, QTableWidgetItem(typ))
-                self.table.setItem(r, 1, QTableWidgetItem(str(ref)))
-                self.table.setItem(r, 2, QTableWidgetItem(str(date)))
-                self.table.setItem(r, 3, QTableWidgetItem(f"R{(amt or 0):,.2f}"))
-                self.table.setItem(r, 4, QTableWidgetItem(f"R{balance:,.2f}"))
+                parts.append("SELECT 'Payment' AS typ, id, date, amount FROM transactions WHERE customer_id=?")
+            if not parts:
+                return name, []
+            items = cur.execute(" UNION ALL ".join(parts) + " ORDER BY date, typ",
+                                (self.customer_id,) * len(parts))
+            # compute running balance straight off the cursor
+            return name, list(iter_ledger_rows(items))
+
+    def load_ledger(self):
+        name, self._items = self._fetch_ledger_rows()
+        if name is None:
+            return
+        self.lbl_info.setText(f"Ledger for: {name}")
+
+        # fill with sorting, signals and repaints suspended
+        sorting = self.table.isSortingEnabled()
+        self.table.setSortingEnabled(False)
+        self.table.setUpdatesEnabled(False)
+        self.table.blockSignals(True)
+        try:
+            self.table.setRowCount(len(self._items))
+            cells = [[QTableWidgetItem(text) for text in values] for values in self._items]
+            set_item = self.table.setItem
+            for r, row_items in enumerate(cells):
+                for c, item in enumerate(row_items):
+                    set_item(r, c, item)
         finally:
-            try:
-                conn.close()
-            except:
-                pass
+            self.table.blockSignals(False)
+            self.table.setUpdatesEnabled(True)
+            self.table.setSortingEnabled(sorting)
 
     def _export_csv(self):
         path, _ = QFileDialog.getSaveFileName(self, "Export Ledger CSV", "ledger.csv", "CSV Files (*.csv)")
         if not path:
             return
         try:
-            with open(path, "w", newline="", encoding="utf-8") as f:
+            # export the rows already loaded for the grid rather than reading cells back out of it
+            with open(path, "w", newline="", encoding="utf-8", buffering=1 << 20) as f:
                 writer = csv.writer(f)
-                # headers
-                headers = [self.table.horizontalHeaderItem(i).text() for i in range(self.table.columnCount())]
-                writer.writerow(headers)
-                for r in range(self.table.rowCount()):
-                    row = [self.table.item(r, c).text() if self.table.item(r, c) else "" for c in
-                           range(self.table.columnCount())]
-                    writer.writerow(row)
+                writer.writerow(LEDGER_HEADERS)
+                writer.writerows(self._items)
             QMessageBox.information(self, "Exported", f"Ledger exported to {path}")
         except Exception as e:
             QMessageBox.critical(self, "Export failed", str(e))
 
     def _table_exists(self, conn, name: str) -> bool:
+        return table_exists(conn, name)
+
+
+# -----------------------------
+# Customers Table Model
+# -----------------------------
+CUSTOMER_HEADERS = ["ID", "Name", "Email", "Phone", "Outstanding", "Actions"]
+ACTIONS_COLUMN = 5
+
+
+class CustomersModel(QAbstractTableModel):
+    """Holds one page of customers as (id, name, email, phone, outstanding) tuples
+    plus the pre-formatted strings shown in the grid."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self._display = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(CUSTOMER_HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display[index.row()][index.column()]
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return CUSTOMER_HEADERS[section]
+        return None
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = [tuple(r) for r in rows]
+        self._display = [self._format(r) for r in self._rows]
+        self.endResetModel()
+
+    def customer_id(self, row: int):
+        return self._rows[row][0] if 0 <= row < len(self._rows) else None
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        if column >= ACTIONS_COLUMN:
+            return
+        numeric = column in (0, 4)
+
+        def key(pair):
+            value = pair[0][column]
+            return (value or 0) if numeric else (value or "").lower()
+
+        self.layoutAboutToBeChanged.emit()
+        paired = sorted(zip(self._rows, self._display), key=key,
+                        reverse=(order == Qt.SortOrder.DescendingOrder))
+        self._rows = [p[0] for p in paired]
+        self._display = [p[1] for p in paired]
+        self.layoutChanged.emit()
+
+    @staticmethod
+    def _format(row):
+        cid, name, email, phone, outstanding = row
+        return (str(cid), name or "", email or "", phone or "", _money(outstanding or 0), "")
+
+
+class ActionDelegate(QStyledItemDelegate):
+    """Paints Edit / Ledger buttons in the actions column instead of real widgets.
+    Clicks are reported through the single actionTriggered(action, row) signal."""
+    LABELS = ("Edit", "Ledger")
+    actionTriggered = pyqtSignal(str, int)
+
+    def _button_rects(self, rect):
+        w = rect.width() // 2
+        return (QRect(rect.left() + 2, rect.top() + 2, w - 4, rect.height() - 4),
+                QRect(rect.left() + w + 2, rect.top() + 2, rect.width() - w - 4, rect.height() - 4))
+
+    def paint(self, painter, option, index):
+        style = QApplication.style()
+        for label, rect in zip(self.LABELS, self._button_rects(option.rect)):
+            btn = QStyleOptionButton()
+            btn.rect = rect
+            btn.text = label
+            btn.state = QStyle.StateFlag.State_Enabled
+            style.drawControl(QStyle.ControlElement.CE_PushButton, btn, painter)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease:
+            pos = event.position().toPoint()
+            for label, rect in zip(self.LABELS, self._button_rects(option.rect)):
+                if rect.contains(pos):
+                    self.actionTriggered.emit(label, index.row())
+                    return True
+        return super().editorEvent(event, model, option, index)
+
+
+# -----------------------------
+# KPI worker
+# -----------------------------
+class KpiSignals(QObject):
+    done = pyqtSignal(int, int, float, float)  # token, total customers, outstanding, 30-day sales
+
+
+class KpiTask(QRunnable):
+    """Runs the customer KPI aggregate on a pooled read connection off the UI thread."""
+
+    def __init__(self, token, current_token, sql, params, signals):
+        super().__init__()
+        self.token = token
+        self._current_token = current_token
+        self.sql = sql
+        self.params = params
+        self.signals = signals
+
+    def run(self):
+        if self._current_token() != self.token:
+            return
+        pool = get_pool()
+        if not pool:
+            return
         try:
-            cur = conn.cursor()
-            cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (name,))
-            return cur.fetchone() is not None
-        except Exception:
-            return False
+            with pool.read() as conn:
+                row = conn.execute(self.sql, self.params).fetchone()
+        except Exception as e:
+            print("[CustomersTab] KPI query failed:", e)
+            return
+        if self._current_token() == self.token:
+            self.signals.done.emit(self.token, row[0] or 0, float(row[1] or 0), float(row[2] or 0))
 
 
 # -----------------------------
@@ -258,12 +431,37 @@ class CustomersTab(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.page = 0
+        # keyset paging: sort key of the row each visible page starts after (None = first page)
+        self._page_starts = [None]
+        self._last_key = None
+        self._page_full = False
         self.sort_column = 1
         self.sort_order = Qt.SortOrder.AscendingOrder
+        self._has_invoices = False
+        self._has_tx = False
+        self._refresh_token = 0
+        self._kpi_signals = KpiSignals(self)
+        self._kpi_signals.done.connect(self._apply_kpis)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._do_search_refresh)
+        self._init_schema()
         self.build_ui()
         self.refresh()
 
+    def _init_schema(self):
+        pool = get_pool()
+        if not pool:
+            return
+        try:
+            with pool.write() as conn:
+                self._has_invoices = self._table_exists(conn, "invoices")
+                self._has_tx = self._table_exists(conn, "transactions")
+                ensure_customer_schema(conn, self._has_invoices, self._has_tx)
+        except Exception as e:
+            print("[CustomersTab] schema check failed:", e)
+
     def build_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(12, 12, 12, 12)
@@ -282,7 +480,7 @@ class CustomersTab(QWidget):
 
         self.filter_combo = QComboBox()
         self.filter_combo.addItems(["All", "Has Outstanding", "Top 10", "Recently Active (30d)"])
-        self.filter_combo.currentIndexChanged.connect(self.refresh)
+        self.filter_combo.currentIndexChanged.connect(self._do_search_refresh)
         header.addWidget(self.filter_combo)
 
         add_btn = QPushButton("+ Add Customer")
@@ -320,14 +518,17 @@ class CustomersTab(QWidget):
         layout.addLayout(kpi_row)
 
         # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["ID", "Name", "Email", "Phone", "Outstanding", "Actions"])
+        self.model = CustomersModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setSortingEnabled(True)
-        self.table.cellClicked.connect(self._handle_table_click)
-        self.table.itemDoubleClicked.connect(self._double_click_edit)
+        self.actions_delegate = ActionDelegate(self)
+        self.actions_delegate.actionTriggered.connect(self._dispatch_action)
+        self.table.setItemDelegateForColumn(ACTIONS_COLUMN, self.actions_delegate)
+        self.table.clicked.connect(self._handle_table_click)
+        self.table.doubleClicked.connect(self._double_click_edit)
 
         # Table takes remaining space
         self.table.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Expanding)
@@ -383,150 +584,155 @@ class CustomersTab(QWidget):
     # Pagination & search
     # --------------------------
     def _on_search_changed(self):
-        self.page = 0
+        # restart the timer so only the last keystroke in a burst refreshes
+        self._search_timer.start()
+
+    def _do_search_refresh(self):
+        self._page_starts = [None]
         self.refresh()
 
+    @property
+    def page(self) -> int:
+        return len(self._page_starts) - 1
+
     def _prev_page(self):
-        if self.page > 0:
-            self.page -= 1
+        if len(self._page_starts) > 1:
+            self._page_starts.pop()
             self.refresh()
 
     def _next_page(self):
-        self.page += 1
-        self.refresh()
+        if self._page_full and self._last_key is not None:
+            self._page_starts.append(self._last_key)
+            self.refresh()
 
     # --------------------------
     # Load data
     # --------------------------
     def refresh(self):
-        conn = get_conn_safe()
-        if not conn:
+        pool = get_pool()
+        if not pool:
             return
         try:
-            cur = conn.cursor()
-
-            search = f"%{self.search.text().strip()}%"
-            filter_mode = self.filter_combo.currentText()
-
-            base_where = "1=1"
-            params = []
-
-            # filter modes
-            if filter_mode == "Has Outstanding":
-                if self._table_exists(conn, "invoices"):
-                    base_where = "(SELECT IFNULL(SUM(total),0) FROM invoices WHERE customer_id = customers.id AND status != 'Paid') > 0"
+            with pool.read() as conn:
+                cur = conn.cursor()
+
+                search = f"%{self.search.text().strip()}%"
+                filter_mode = self.filter_combo.currentText()
+
+                base_where = "1=1"
+                params = []
+
+                # outstanding comes from one pre-aggregated join instead of a per-row subquery
+                if self._has_invoices:
+                    join_sql = """
+                        LEFT JOIN (
+                            SELECT customer_id, SUM(total) AS outstanding FROM invoices
+                            WHERE status != 'Paid' GROUP BY customer_id
+                        ) o ON o.customer_id = c.id
+                    """
+                    outstanding_sql = "IFNULL(o.outstanding, 0)"
                 else:
-                    base_where = "0"
-            elif filter_mode == "Top 10":
-                # we'll handle ordering later
-                pass
-            elif filter_mode == "Recently Active (30d)":
-                if self._table_exists(conn, "invoices"):
-                    base_where = "EXISTS(SELECT 1 FROM invoices WHERE customer_id = customers.id AND date >= date('now','-30 day'))"
+                    join_sql = ""
+                    outstanding_sql = "0"
+
+                # filter modes
+                if filter_mode == "Has Outstanding":
+                    base_where = f"{outstanding_sql} > 0"
+                elif filter_mode == "Top 10":
+                    # we'll handle ordering later
+                    pass
+                elif filter_mode == "Recently Active (30d)":
+                    if self._has_invoices:
+                        base_where = "c.id IN (SELECT customer_id FROM invoices WHERE date >= date('now','-30 day'))"
+                    else:
+                        base_where = "0"
+
+                # search clause
+                search_clause = "(c.name LIKE ? OR c.email LIKE ? OR c.phone LIKE ?)"
+                params.extend([search, search, search])
+
+                # final where
+                where_sql = f"WHERE {base_where} AND " + search_clause
+
+                # KPI aggregates run on a worker; the grid paints without waiting for them
+                if self._has_invoices:
+                    sales_sql = ("(SELECT IFNULL(SUM(total),0) FROM invoices "
+                                 "WHERE date >= date('now','-30 day') AND status != 'Draft')")
                 else:
-                    base_where = "0"
-
-            # search clause
-            search_clause = "(name LIKE ? OR email LIKE ? OR phone LIKE ?)"
-            params.extend([search, search, search])
-
-            # final where
-            where_sql = f"WHERE {base_where} AND " + search_clause
-
-            # count total
-            count_sql = f"SELECT COUNT(1) as cnt FROM customers {where_sql}"
-            total = cur.execute(count_sql, params).fetchone()[0]
-
-            # paging
-            offset = self.page * PAGE_SIZE
-            limit = PAGE_SIZE
-
-            # main query with outstanding calculation (safe)
-            sql = f"""
-                SELECT id, name, email, phone,
-                CASE
-                    WHEN EXISTS (SELECT 1 FROM sqlite_master WHERE type='table' AND name='invoices')
-                    THEN (
-                        SELECT IFNULL(SUM(total),0) FROM invoices
-                        WHERE customer_id = customers.id AND status != 'Paid'
-                    )
-                    ELSE 0
-                END AS outstanding,
-                (
-                    SELECT IFNULL(SUM(total),0) FROM invoices
-                    WHERE customer_id = customers.id AND status != 'Paid'
-                ) AS outstanding
-                FROM customers
-                {where_sql}
-            """
-
-            # ordering
-            sql += " ORDER BY name ASC"
-            if filter_mode == "Top 10":
-                sql = sql.replace("ORDER BY name ASC", "ORDER BY outstanding DESC")
-
-            sql += " LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
-
-            rows = cur.execute(sql, params).fetchall()
-
-            # fill table
-            self.table.setRowCount(len(rows))
-            total_outstanding = 0
-            for r, row in enumerate(rows):
-                cid = row["id"]
-                total_outstanding += row["outstanding"] or 0
-                self.table.setItem(r, 0, QTableWidgetItem(str(cid)))
-                self.table.setItem(r, 1, QTableWidgetItem(row["name"] or ""))
-                self.table.setItem(r, 2, QTableWidgetItem(row["email"] or ""))
-                self.table.setItem(r, 3, QTableWidgetItem(row["phone"] or ""))
-                self.table.setItem(r, 4, QTableWidgetItem(f"R{(row['outstanding'] or 0):,.2f}"))
-
-                # actions column (Edit, Ledger)
-                btn_edit = QPushButton("Edit")
-                btn_edit.clicked.connect(partial(self.edit_customer, cid))
-                btn_ledger = QPushButton("Ledger")
-                btn_ledger.clicked.connect(partial(self.open_ledger, cid))
-                w = QWidget()
-                hl = QHBoxLayout(w)
-                hl.setContentsMargins(0, 0, 0, 0)
-                hl.addWidget(btn_edit)
-                hl.addWidget(btn_ledger)
-                self.table.setCellWidget(r, 5, w)
-
-            # KPIs
-            self.kpi_total_customers.value_label.setText(str(total))
-            self.kpi_outstanding.value_label.setText(f"R{total_outstanding:,.2f}")
-
-            # last 30 days sales
-            sales = 0
-            if self._table_exists(conn, "invoices"):
-                sales_row = cur.execute(
-                    "SELECT IFNULL(SUM(total),0) as s FROM invoices WHERE date >= date('now','-30 day') AND status != 'Draft'").fetchone()
-                sales = sales_row["s"] if sales_row else 0
-            self.kpi_month_sales.value_label.setText(f"R{sales:,.2f}")
+                    sales_sql = "0"
+                kpi_sql = f"""
+                    SELECT COUNT(1), IFNULL(SUM({outstanding_sql}), 0), {sales_sql}
+                    FROM customers c {join_sql} {where_sql}
+                """
+                self._refresh_token += 1
+                QThreadPool.globalInstance().start(
+                    KpiTask(self._refresh_token, lambda: self._refresh_token, kpi_sql, list(params), self._kpi_signals))
+
+                # keyset paging: seek past the last row of the previous page instead of OFFSET
+                top_mode = filter_mode == "Top 10"
+                if top_mode:
+                    order_sql = "ORDER BY outstanding DESC, c.id ASC"
+                    seek_sql = f"({outstanding_sql} < ? OR ({outstanding_sql} = ? AND c.id > ?))"
+                else:
+                    order_sql = "ORDER BY c.name ASC, c.id ASC"
+                    seek_sql = "(c.name, c.id) > (?, ?)"
+
+                after = self._page_starts[-1]
+                if after is not None:
+                    where_sql += f" AND {seek_sql}"
+                    params.extend((after[0], after[0], after[1]) if top_mode else after)
+
+                sql = f"""
+                    SELECT c.id, c.name, c.email, c.phone, {outstanding_sql} AS outstanding
+                    FROM customers c
+                    {join_sql}
+                    {where_sql}
+                    {order_sql}
+                    LIMIT ?
+                """
+                params.append(PAGE_SIZE)
+
+                rows = cur.execute(sql, params).fetchall()
+                self._page_full = len(rows) == PAGE_SIZE
+                if rows:
+                    last = rows[-1]
+                    self._last_key = (last["outstanding"], last["id"]) if top_mode else (last["name"], last["id"])
+                else:
+                    self._last_key = None
 
-            # page label
-            self.lbl_page.setText(f"Page: {self.page + 1} / {max(1, (total - 1) // PAGE_SIZE + 1)}")
+                # fill table
+                self.model.set_rows((row["id"], row["name"], row["email"], row["phone"], row["outstanding"]) for row in rows)
 
         except Exception as e:
             print("[CustomersTab] refresh failed:", e)
-        finally:
-            try:
-                conn.close()
-            except:
-                pass
 
-    def _handle_table_click(self, row, col):
+    def _apply_kpis(self, token, total, outstanding, sales):
+        if token != self._refresh_token:
+            return  # a newer refresh is in flight
+        self.kpi_total_customers.value_label.setText(str(total))
+        self.kpi_outstanding.value_label.setText(_money(outstanding))
+        self.kpi_month_sales.value_label.setText(_money(sales))
+        self.lbl_page.setText(f"Page: {self.page + 1} / {max(1, (total - 1) // PAGE_SIZE + 1)}")
+
+    def _dispatch_action(self, action: str, row: int):
+        cid = self.model.customer_id(row)
+        if cid is None:
+            return
+        if action == "Edit":
+            self.edit_customer(cid)
+        elif action == "Ledger":
+            self.open_ledger(cid)
+
+    def _handle_table_click(self, index):
         # support copy/paste or future actions
         pass
 
-    def _double_click_edit(self, item):
+    def _double_click_edit(self, index):
+        if index.column() == ACTIONS_COLUMN:
+            return
         try:
-            row = item.row()
-            cid_item = self.table.item(row, 0)
-            if cid_item:
-                cid = int(cid_item.text())
+            cid = self.model.customer_id(index.row())
+            if cid is not None:
                 self.edit_customer(cid)
         except Exception as e:
             print("Double click edit failed:", e)
@@ -541,55 +747,62 @@ class CustomersTab(QWidget):
                                               "CSV Files (*.csv)")
         if not path:
             return
-        conn = get_conn_safe()
-        if not conn:
+        pool = get_pool()
+        if not pool:
             return
         try:
-            cur = conn.cursor()
-            rows = cur.execute("SELECT id FROM customers ORDER BY name").fetchall()
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["CustomerID", "Name", "StatementCSVPath"])
-                for r in rows:
-                    cid = r["id"]
+            with pool.read() as conn:
+                # one read transaction; invoices are merge-joined per customer straight off the cursor
+                conn.execute("BEGIN")
+                cust_name = dict(conn.execute("SELECT id, name FROM customers ORDER BY id").fetchall())
+
+                payments = {}
+                if self._has_tx:
+                    for p in conn.execute("SELECT customer_id, id, date, amount FROM transactions "
+                                          "WHERE customer_id IS NOT NULL ORDER BY customer_id, date"):
+                        payments.setdefault(p["customer_id"], []).append(("Payment", p["id"], p["date"], p["amount"]))
+
+                invoices = ()
+                if self._has_invoices:
+                    invoices = conn.execute("SELECT customer_id, id, date, total FROM invoices "
+                                            "WHERE customer_id IS NOT NULL ORDER BY customer_id, date")
+                inv_groups = groupby(invoices, key=itemgetter(0))
+                group = next(inv_groups, None)
+
+                index_rows = []
+                for cid, name in cust_name.items():
+                    items = []
+                    while group is not None and group[0] < cid:
+                        group = next(inv_groups, None)
+                    if group is not None and group[0] == cid:
+                        items.extend(("Invoice", i[1], i[2], i[3]) for i in group[1])
+                        group = next(inv_groups, None)
+                    items.extend(payments.get(cid, ()))
+                    items.sort(key=lambda x: x[2] or "")
+
                     # create a small CSV per customer in same folder
-                    cust_name_row = cur.execute("SELECT name FROM customers WHERE id=?", (cid,)).fetchone()
-                    name = cust_name_row["name"] if cust_name_row else str(cid)
                     cust_path = f"{path[:-4]}_cust_{cid}.csv"
-                    ledger = CustomerLedgerDialog(cid, self)
-                    # reuse ledger logic to produce CSV rows
-                    ledger.load_ledger()
-                    # write ledger CSV
                     with open(cust_path, "w", newline="", encoding="utf-8") as cf:
                         w2 = csv.writer(cf)
-                        # header
-                        headers = [ledger.table.horizontalHeaderItem(i).text() for i in
-                                   range(ledger.table.columnCount())]
-                        w2.writerow(headers)
-                        for rr in range(ledger.table.rowCount()):
-                            rowvals = [ledger.table.item(rr, c).text() if ledger.table.item(rr, c) else "" for c in
-                                       range(ledger.table.columnCount())]
-                            w2.writerow(rowvals)
-                    writer.writerow([cid, name, cust_path])
-            QMessageBox.information(self, "Exported", f"Statements exported to CSV files (index: {path})")
+                        w2.writerow(LEDGER_HEADERS)
+                        w2.writerows(iter_ledger_rows(items))
+                    index_rows.append((name or str(cid), cid, cust_path))
+                conn.commit()
+
+                index_rows.sort(key=lambda x: x[0])
+                with open(path, "w", newline="", encoding="utf-8") as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["CustomerID", "Name", "StatementCSVPath"])
+                    writer.writerows((cid, name, cust_path) for name, cid, cust_path in index_rows)
+                QMessageBox.information(self, "Exported", f"Statements exported to CSV files (index: {path})")
         except Exception as e:
             QMessageBox.critical(self, "Export failed", str(e))
-        finally:
-            try:
-                conn.close()
-            except:
-                pass
 
     # --------------------------
     # Utility
     # --------------------------
     def _table_exists(self, conn, name: str) -> bool:
-        try:
-            cur = conn.cursor()
-            cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (name,))
-            return cur.fetchone() is not None
-        except Exception:
-            return False
+        return table_exists(conn, name)
 
     # --------------------------
     # UI Fixes & Enhancements
@@ -14,37 +14,77 @@ Features:
 
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QTableWidget, QTableWidgetItem, QSizePolicy, QFrame, QSpacerItem,
+    QTableView, QSizePolicy, QFrame, QSpacerItem,
     QFileDialog
 )
-from PyQt6.QtCore import Qt, QDate, pyqtSignal
+from PyQt6.QtCore import (
+    Qt, QDate, pyqtSignal, QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool
+)
 from PyQt6.QtGui import QFont
 from PyQt6.QtPrintSupport import QPrinter, QPrintDialog
 
-# matplotlib for embedding
-from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-
-from shared.db import get_conn_safe
-from shared.ledger_engine import profit_and_loss, trial_balance
-from datetime import datetime, timedelta
+from shared.db import get_pool, table_exists
+from shared.ledger_engine import profit_and_loss, trial_balance, dashboard_kpis
+from contextlib import nullcontext
+from functools import lru_cache
+from datetime import datetime
 import sqlite3
 import csv
 
+import numpy as np
+
+
+@lru_cache(maxsize=4096)
+def _fmt_rounded(value: float) -> str:
+    return f"R{value:,.2f}"
+
+
+def _fmt_r(value) -> str:
+    """Currency label; rounded first so float noise doesn't defeat the cache."""
+    return _fmt_rounded(round(value or 0, 2))
+
+
+def _month_keys(first: int, last: int, today=None):
+    """'YYYY-MM' keys for calendar-month offsets first..last from the current month."""
+    today = today or datetime.now()
+    base = today.year * 12 + today.month - 1
+    return [f"{(base + i) // 12:04d}-{(base + i) % 12 + 1:02d}" for i in range(first, last + 1)]
+
+
+# invoice statuses still owed (Draft and Paid are the others); a positive set keeps the index usable
+OUTSTANDING_INVOICE_STATUSES = ("Sent", "Overdue")
+
+
+def ensure_dashboard_indexes(conn):
+    """Indexes behind the dashboard's date, status and due-date filters."""
+    cur = conn.cursor()
+    if table_exists(conn, "invoices"):
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_invoices_date_status ON invoices(date, status)")
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_invoices_status_due ON invoices(status, due_date)")
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_invoices_customer_total ON invoices(customer_id, total)")
+    if table_exists(conn, "bills"):
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_bills_date ON bills(date)")
+        cur.execute("CREATE INDEX IF NOT EXISTS ix_bills_due_status ON bills(due_date, status)")
+
 
 # ------------------------------
 # Small helper widgets
 # ------------------------------
+# applied once on the Dashboard rather than per card, so Qt parses and polishes one sheet
+KPI_STYLE = """
+    QFrame#kpi { border: 1px solid #ddd; border-radius: 8px; padding: 10px; background: transparent; }
+    QLabel#kpiTitle { color:#666; }
+    QLabel#kpiSubtitle { color:#888; font-size:10px; }
+"""
+
+
 class KPIWidget(QFrame):
     def __init__(self, title: str, value: str, subtitle: str = ""):
         super().__init__()
         self.setObjectName("kpi")
-        self.setStyleSheet("""
-            QFrame#kpi { border: 1px solid #ddd; border-radius: 8px; padding: 10px; background: transparent; }
-        """)
         lay = QVBoxLayout(self)
         self.title = QLabel(title)
-        self.title.setStyleSheet("color:#666;")
+        self.title.setObjectName("kpiTitle")
         self.title.setFont(QFont("", 9))
         lay.addWidget(self.title)
 
@@ -53,7 +93,7 @@ class KPIWidget(QFrame):
         lay.addWidget(self.value_lbl)
 
         self.subtitle = QLabel(subtitle)
-        self.subtitle.setStyleSheet("color:#888; font-size:10px;")
+        self.subtitle.setObjectName("kpiSubtitle")
         lay.addWidget(self.subtitle)
 
     def set(self, value: str, subtitle: str = ""):
@@ -65,33 +105,122 @@ class MiniChart(QWidget):
     """Simple matplotlib canvas wrapper for small charts"""
     def __init__(self, width=4, height=2.2, dpi=100):
         super().__init__()
+        # matplotlib is imported on first chart construction, not with the module
+        from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
         self.figure = Figure(figsize=(width, height), dpi=dpi)
         self.canvas = FigureCanvas(self.figure)
         lay = QVBoxLayout(self)
         lay.setContentsMargins(0,0,0,0)
         lay.addWidget(self.canvas)
+        # one Axes for the life of the chart; refreshes only swap artist data
+        self.ax = self.figure.add_subplot(111)
+        self.ax.grid(True, linestyle=':', linewidth=0.5)
+        self.line = None
+        self.bars = None
 
     def plot_line(self, x, y, label=None, heatmap=False):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
         if heatmap:
-            colors = ["green" if v >= 0 else "red" for v in y]
-            ax.bar(x, y, color=colors)
+            y = np.asarray(y, dtype=float)
+            self._set_bars(x, y, np.where(y >= 0, "green", "red").tolist())
         else:
-            ax.plot(x, y, marker='o')
-        if label:
-            ax.set_title(label)
-        ax.grid(True, linestyle=':', linewidth=0.5)
-        self.canvas.draw()
+            self._drop_bars()
+            if self.line is None:
+                self.line, = self.ax.plot([], [], marker='o')
+            self.line.set_data(range(len(y)), y)
+        self._finish(x, label)
 
     def plot_bar(self, x, y, label=None):
-        self.figure.clear()
-        ax = self.figure.add_subplot(111)
-        ax.bar(x, y)
-        if label:
-            ax.set_title(label)
-        ax.grid(True, linestyle=':', linewidth=0.5)
-        self.canvas.draw()
+        self._set_bars(x, y)
+        self._finish(x, label)
+
+    def _set_bars(self, x, y, colors=None):
+        if self.line is not None:
+            self.line.remove()
+            self.line = None
+        if self.bars is not None and len(self.bars) == len(y):
+            for i, (rect, h) in enumerate(zip(self.bars, y)):
+                rect.set_height(h)
+                if colors:
+                    rect.set_facecolor(colors[i])
+        else:
+            self._drop_bars()
+            self.bars = self.ax.bar(range(len(y)), y, color=colors)
+
+    def _drop_bars(self):
+        if self.bars is not None:
+            self.bars.remove()
+            self.bars = None
+
+    def _finish(self, x, label):
+        self.ax.set_xticks(range(len(x)), labels=[str(v) for v in x])
+        self.ax.set_title(label or "")
+        self.ax.relim()
+        self.ax.autoscale_view()
+        self.canvas.draw_idle()
+
+
+class RowModel(QAbstractTableModel):
+    """Read-only model over preformatted row tuples for the dashboard lists."""
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self._headers = list(headers)
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self._rows[index.row()][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self._headers[section]
+        return None
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def rows(self):
+        return self._rows
+
+
+def _list_view(model):
+    view = QTableView()
+    view.setModel(model)
+    view.horizontalHeader().setStretchLastSection(True)
+    view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+    return view
+
+
+class ExportSignals(QObject):
+    finished = pyqtSignal(str, str)  # path, error ("" on success)
+
+
+class CsvExportTask(QRunnable):
+    """Writes rows snapshotted on the UI thread to a CSV file off the UI thread."""
+
+    def __init__(self, path, rows, signals):
+        super().__init__()
+        self.path = path
+        self.rows = rows
+        self.signals = signals
+
+    def run(self):
+        try:
+            with open(self.path, "w", newline="", encoding="utf-8") as f:
+                csv.writer(f).writerows(self.rows)
+        except Exception as e:
+            self.signals.finished.emit(self.path, str(e))
+            return
+        self.signals.finished.emit(self.path, "")
 
 
 # ------------------------------
@@ -105,16 +234,33 @@ class Dashboard(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setObjectName("dashboard")
+        self._refresh_cache = {}
+        self._tables = frozenset()
+        self._last_fingerprint = None
+        self._export_signals = ExportSignals(self)
+        self._export_signals.finished.connect(self._export_finished)
+        self._init_schema()
         self.build_ui()
         try:
             self.refresh()
         except Exception as e:
             print("[Dashboard] Initial refresh error:", e)
 
+    def _init_schema(self):
+        pool = get_pool()
+        if not pool:
+            return
+        try:
+            with pool.write() as conn:
+                ensure_dashboard_indexes(conn)
+        except Exception as e:
+            print("[Dashboard] index check failed:", e)
+
     # -------------------------
     # UI construction
     # -------------------------
     def build_ui(self):
+        self.setStyleSheet(KPI_STYLE)
         outer = QVBoxLayout(self)
         outer.setContentsMargins(14, 12, 14, 12)
         outer.setSpacing(12)
@@ -131,7 +277,7 @@ class Dashboard(QWidget):
         header.addWidget(self.filter_combo)
 
         self.btn_refresh = QPushButton("Refresh")
-        self.btn_refresh.clicked.connect(self.refresh)
+        self.btn_refresh.clicked.connect(lambda: self.refresh(force=True))
         header.addWidget(self.btn_refresh)
 
         self.btn_export = QPushButton("Export CSV")
@@ -189,24 +335,18 @@ class Dashboard(QWidget):
 
         right.addWidget(QLabel("<b>Outstanding Invoices</b>"))
         # Create tables BEFORE wiring signals
-        self.tbl_invoices = QTableWidget()
-        self.tbl_invoices.setColumnCount(4)
-        self.tbl_invoices.setHorizontalHeaderLabels(["ID", "Customer", "Due Date", "Amount"])
-        self.tbl_invoices.horizontalHeader().setStretchLastSection(True)
+        self.invoices_model = RowModel(["ID", "Customer", "Due Date", "Amount"], self)
+        self.tbl_invoices = _list_view(self.invoices_model)
         right.addWidget(self.tbl_invoices, 1)
 
         right.addWidget(QLabel("<b>Overdue Bills</b>"))
-        self.tbl_bills = QTableWidget()
-        self.tbl_bills.setColumnCount(4)
-        self.tbl_bills.setHorizontalHeaderLabels(["ID", "Vendor", "Due Date", "Amount"])
-        self.tbl_bills.horizontalHeader().setStretchLastSection(True)
+        self.bills_model = RowModel(["ID", "Vendor", "Due Date", "Amount"], self)
+        self.tbl_bills = _list_view(self.bills_model)
         right.addWidget(self.tbl_bills, 1)
 
         right.addWidget(QLabel("<b>Top Customers (by invoiced total)</b>"))
-        self.tbl_customers = QTableWidget()
-        self.tbl_customers.setColumnCount(3)
-        self.tbl_customers.setHorizontalHeaderLabels(["Customer", "Invoices", "Total"])
-        self.tbl_customers.horizontalHeader().setStretchLastSection(True)
+        self.customers_model = RowModel(["Customer", "Invoices", "Total"], self)
+        self.tbl_customers = _list_view(self.customers_model)
         right.addWidget(self.tbl_customers, 1)
 
         mid.addLayout(right, 1)
@@ -217,109 +357,127 @@ class Dashboard(QWidget):
         outer.addItem(QSpacerItem(20, 10))
 
         # Connect signals after creation
-        self.tbl_invoices.itemDoubleClicked.connect(self._invoice_row_clicked)
-        self.tbl_bills.itemDoubleClicked.connect(self._bill_row_clicked)
+        self.tbl_invoices.doubleClicked.connect(self._invoice_row_clicked)
+        self.tbl_bills.doubleClicked.connect(self._bill_row_clicked)
 
     # -------------------------
     # Helpers
     # -------------------------
-    def _table_exists(self, conn, name: str) -> bool:
+    def _snapshot_tables(self, conn):
+        if not conn:
+            self._tables = frozenset()
+            return
         try:
-            cur = conn.cursor()
-            cur.execute("SELECT name FROM sqlite_master WHERE type='table' AND name=?", (name,))
-            return cur.fetchone() is not None
+            self._tables = frozenset(r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type='table'"))
         except Exception:
-            return False
-
-    def _invoice_row_clicked(self, item):
+            self._tables = frozenset()
+
+    def _table_exists(self, name: str) -> bool:
+        return name in self._tables
+
+    @staticmethod
+    def _tuple_cursor(conn):
+        """Cursor yielding plain tuples for positional unpacking (the pooled connection keeps sqlite3.Row)."""
+        cur = conn.cursor()
+        cur.row_factory = None
+        return cur
+
+    def _pl(self, conn=None):
+        """profit_and_loss(), computed at most once per refresh."""
+        pl = self._refresh_cache.get("pl")
+        if pl is None:
+            pl = self._refresh_cache["pl"] = profit_and_loss(conn)
+        return pl
+
+    def _tb(self, conn=None):
+        """trial_balance(), computed at most once per refresh."""
+        tb = self._refresh_cache.get("tb")
+        if tb is None:
+            tb = self._refresh_cache["tb"] = trial_balance(conn)
+        return tb
+
+    def _invoice_row_clicked(self, index):
         try:
-            row = item.row()
-            inv_id_item = self.tbl_invoices.item(row, 0)
-            if inv_id_item:
-                invoice_id = int(inv_id_item.text())
-                self.open_invoice_requested.emit(invoice_id)
+            invoice_id = int(self.invoices_model.rows()[index.row()][0])
+            self.open_invoice_requested.emit(invoice_id)
         except Exception as e:
             print("[Dashboard] invoice click failed:", e)
 
-    def _bill_row_clicked(self, item):
+    def _bill_row_clicked(self, index):
         try:
-            row = item.row()
-            bill_id_item = self.tbl_bills.item(row, 0)
-            if bill_id_item:
-                bill_id = int(bill_id_item.text())
-                self.open_bill_requested.emit(bill_id)
+            bill_id = int(self.bills_model.rows()[index.row()][0])
+            self.open_bill_requested.emit(bill_id)
         except Exception as e:
             print("[Dashboard] bill click failed:", e)
 
     # -------------------------
     # Data loading / main refresh
     # -------------------------
-    def refresh(self):
+    def refresh(self, force=False):
+        pool = get_pool()
+        # skip the rebuild when nothing was committed since the last one (and the day hasn't rolled over)
+        fingerprint = (pool.fingerprint(), datetime.now().date()) if pool else None
+        if not force and fingerprint is not None and fingerprint == self._last_fingerprint:
+            return
+        self._refresh_cache = {}
         try:
-            self._load_kpis()
-            self._load_monthly_income_expenses_chart()
-            self._load_pl_summary_chart()
-            self._load_outstanding_invoices()
-            self._load_overdue_bills()
-            self._load_top_customers()
-            self._load_cashflow_forecast()
+            # one pooled connection serves every loader in this refresh, ledger_engine included
+            with (pool.read() if pool else nullcontext()) as conn:
+                self._snapshot_tables(conn)
+                self._load_kpis(conn)
+                self._load_monthly_income_expenses_chart(conn)
+                self._load_pl_summary_chart(conn)
+                self._load_outstanding_invoices(conn)
+                self._load_overdue_bills(conn)
+                self._load_top_customers(conn)
+                self._load_cashflow_forecast(conn)
+            self._last_fingerprint = fingerprint
         except Exception as e:
             print("[Dashboard] refresh failed:", e)
 
-    def _load_kpis(self):
-        # Bank balance — try to fetch from trial_balance by account code 1000 (Bank Account)
+    def _load_kpis(self, conn=None):
+        # bank balance (account 1000) and trailing-12-month P&L totals in one journal pass
         try:
-            tb = trial_balance()
-            bank_balance = 0.0
-            for a in tb:
-                if a.get("account_code") == "1000":
-                    bank_balance = a.get("balance") or 0.0
-                    break
+            kpis = self._refresh_cache.get("kpis")
+            if kpis is None:
+                kpis = self._refresh_cache["kpis"] = dashboard_kpis(conn=conn)
+            bank_balance = kpis["bank_balance"]
+            total_income = kpis["total_income"]
+            total_expenses = kpis["total_expenses"]
+            net_profit = kpis["net_profit"]
         except Exception:
             bank_balance = 0.0
-
-        # P&L
-        try:
-            pl = profit_and_loss()
-            total_income = sum(i.get("balance", 0) for i in pl.get("income", []))
-            total_expenses = sum(e.get("balance", 0) for e in pl.get("expenses", []))
-            net_profit = pl.get("net_profit", total_income - total_expenses)
-        except Exception:
             total_income = 0.0
             total_expenses = 0.0
             net_profit = 0.0
 
-        self.kpi_bank.set(f"R{bank_balance:,.2f}", "Primary bank account")
-        self.kpi_income.set(f"R{total_income:,.2f}", "Trailing 12 months")
-        self.kpi_expenses.set(f"R{total_expenses:,.2f}", "Trailing 12 months")
-        self.kpi_net.set(f"R{net_profit:,.2f}", "Trailing 12 months")
+        self.kpi_bank.set(_fmt_r(bank_balance), "Primary bank account")
+        self.kpi_income.set(_fmt_r(total_income), "Trailing 12 months")
+        self.kpi_expenses.set(_fmt_r(total_expenses), "Trailing 12 months")
+        self.kpi_net.set(_fmt_r(net_profit), "Trailing 12 months")
 
-    def _load_monthly_income_expenses_chart(self):
-        conn = get_conn_safe()
+    def _load_monthly_income_expenses_chart(self, conn):
         if not conn:
             # draw empty chart placeholders
-            months = [(datetime.now() - timedelta(days=30*i)).strftime("%Y-%m") for i in range(11, -1, -1)]
+            months = _month_keys(-11, 0)
             self.chart_income_expenses.plot_line(months, [0]*12, label="Income vs Expenses")
             return
         try:
             cur = conn.cursor()
-            now = datetime.now()
-            months = []
-            income_series = []
-            expense_series = []
-            for i in range(11, -1, -1):
-                start = (now.replace(day=1) - timedelta(days=30*i)).replace(day=1)
-                months.append(start.strftime("%Y-%m"))
-                inv_sum = 0.0
-                bill_sum = 0.0
-                if self._table_exists(conn, "invoices"):
-                    r = cur.execute("SELECT IFNULL(SUM(total),0) as s FROM invoices WHERE substr(date,1,7)=? AND status != 'Draft'", (start.strftime("%Y-%m"),)).fetchone()
-                    inv_sum = r["s"] if r else 0.0
-                if self._table_exists(conn, "bills"):
-                    r = cur.execute("SELECT IFNULL(SUM(total),0) as s FROM bills WHERE substr(date,1,7)=?", (start.strftime("%Y-%m"),)).fetchone()
-                    bill_sum = r["s"] if r else 0.0
-                income_series.append(inv_sum)
-                expense_series.append(bill_sum)
+            months = _month_keys(-11, 0)
+            # one grouped query per table for the whole window, then look months up
+            income_by_month = {}
+            expense_by_month = {}
+            if self._table_exists("invoices"):
+                income_by_month = dict(cur.execute(
+                    "SELECT substr(date,1,7) AS m, IFNULL(SUM(total),0) FROM invoices "
+                    "WHERE date >= ? AND status != 'Draft' GROUP BY m", (months[0],)).fetchall())
+            if self._table_exists("bills"):
+                expense_by_month = dict(cur.execute(
+                    "SELECT substr(date,1,7) AS m, IFNULL(SUM(total),0) FROM bills "
+                    "WHERE date >= ? GROUP BY m", (months[0],)).fetchall())
+            income_series = [income_by_month.get(m, 0.0) for m in months]
+            expense_series = [expense_by_month.get(m, 0.0) for m in months]
 
             # fallback if all zeros
             if all(v == 0 for v in income_series) and all(v == 0 for v in expense_series):
@@ -331,15 +489,10 @@ class Dashboard(QWidget):
             self.chart_income_expenses.plot_line(months, net, label="Net Income (monthly)")
         except Exception as e:
             print("[Dashboard] income/expenses chart failed:", e)
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
 
-    def _load_pl_summary_chart(self):
+    def _load_pl_summary_chart(self, conn=None):
         try:
-            pl = profit_and_loss()
+            pl = self._pl(conn)
             income_total = sum(i.get("balance", 0) for i in pl.get("income", []))
             cogs_total = sum(i.get("balance", 0) for i in pl.get("cogs", []))
             expenses_total = sum(i.get("balance", 0) for i in pl.get("expenses", []))
@@ -350,10 +503,9 @@ class Dashboard(QWidget):
         except Exception as e:
             print("[Dashboard] P&L chart failed:", e)
 
-    def _load_cashflow_forecast(self):
-        conn = get_conn_safe()
+    def _load_cashflow_forecast(self, conn):
         if not conn:
-            months = [(datetime.now() + timedelta(days=30*i)).strftime("%Y-%m") for i in range(1,7)]
+            months = _month_keys(1, 6)
             self.chart_cashflow.plot_line(months, [0]*6, label="Cashflow Forecast", heatmap=True)
             return
         try:
@@ -361,75 +513,54 @@ class Dashboard(QWidget):
             # avg invoices per month
             inc = 0.0
             exp = 0.0
-            if self._table_exists(conn, "invoices"):
+            if self._table_exists("invoices"):
                 r = cur.execute("SELECT IFNULL(AVG(m),0) AS avg_inc FROM (SELECT SUM(total) AS m FROM invoices WHERE status != 'Draft' GROUP BY substr(date,1,7) LIMIT 12)").fetchone()
                 inc = r["avg_inc"] if r else 0.0
-            if self._table_exists(conn, "bills"):
+            if self._table_exists("bills"):
                 r = cur.execute("SELECT IFNULL(AVG(m),0) AS avg_exp FROM (SELECT SUM(total) AS m FROM bills GROUP BY substr(date,1,7) LIMIT 12)").fetchone()
                 exp = r["avg_exp"] if r else 0.0
 
-            tb = trial_balance()
+            tb = self._tb(conn)
             opening = next((a.get("balance",0) for a in tb if a.get("account_code") == "1000"), 0)
 
-            months = []
-            values = []
-            now = datetime.now()
-            for i in range(1, 7):
-                future = now + timedelta(days=30 * i)
-                months.append(future.strftime("%Y-%m"))
-                projected = opening + (inc - exp) * i
-                values.append(projected)
+            months = _month_keys(1, 6)
+            values = opening + (inc - exp) * np.arange(1, 7)
 
             self.chart_cashflow.plot_line(months, values, label="Cashflow Forecast", heatmap=True)
         except Exception as e:
             print("[Dashboard] cashflow forecast failed:", e)
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
-
-    def _load_outstanding_invoices(self):
-        conn = get_conn_safe()
+
+    def _load_outstanding_invoices(self, conn):
         if not conn:
-            self.tbl_invoices.setRowCount(0)
+            self.invoices_model.set_rows([])
             return
         try:
-            cur = conn.cursor()
-            if not self._table_exists(conn, "invoices"):
-                self.tbl_invoices.setRowCount(0)
+            cur = self._tuple_cursor(conn)
+            if not self._table_exists("invoices"):
+                self.invoices_model.set_rows([])
                 return
             rows = cur.execute("""
                 SELECT i.id, COALESCE(c.name, '(Unknown)') as customer, i.due_date, i.total
                 FROM invoices i
                 LEFT JOIN customers c ON c.id = i.customer_id
-                WHERE i.status != 'Paid' AND i.status != 'Draft'
+                WHERE i.status IN (?, ?)
                 ORDER BY i.due_date ASC
                 LIMIT 12
-            """).fetchall()
-            self.tbl_invoices.setRowCount(len(rows))
-            for r, rr in enumerate(rows):
-                self.tbl_invoices.setItem(r, 0, QTableWidgetItem(str(rr["id"])))
-                self.tbl_invoices.setItem(r, 1, QTableWidgetItem(str(rr["customer"] or "")))
-                self.tbl_invoices.setItem(r, 2, QTableWidgetItem(str(rr["due_date"] or "")))
-                self.tbl_invoices.setItem(r, 3, QTableWidgetItem(f"R{(rr['total'] or 0):,.2f}"))
+            """, OUTSTANDING_INVOICE_STATUSES).fetchall()
+            self.invoices_model.set_rows(
+                (str(inv_id), str(customer or ""), str(due or ""), _fmt_r(total))
+                for inv_id, customer, due, total in rows)
         except Exception as e:
             print("[Dashboard] load_outstanding_invoices failed:", e)
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
-
-    def _load_overdue_bills(self):
-        conn = get_conn_safe()
+
+    def _load_overdue_bills(self, conn):
         if not conn:
-            self.tbl_bills.setRowCount(0)
+            self.bills_model.set_rows([])
             return
         try:
-            cur = conn.cursor()
-            if not self._table_exists(conn, "bills"):
-                self.tbl_bills.setRowCount(0)
+            cur = self._tuple_cursor(conn)
+            if not self._table_exists("bills"):
+                self.bills_model.set_rows([])
                 return
             today = datetime.now().date().isoformat()
             rows = cur.execute("""
@@ -440,50 +571,40 @@ class Dashboard(QWidget):
                 ORDER BY b.due_date ASC
                 LIMIT 12
             """, (today,)).fetchall()
-            self.tbl_bills.setRowCount(len(rows))
-            for r, rr in enumerate(rows):
-                self.tbl_bills.setItem(r, 0, QTableWidgetItem(str(rr["id"])))
-                self.tbl_bills.setItem(r, 1, QTableWidgetItem(str(rr["vendor"] or "")))
-                self.tbl_bills.setItem(r, 2, QTableWidgetItem(str(rr["due_date"] or "")))
-                self.tbl_bills.setItem(r, 3, QTableWidgetItem(f"R{(rr['total'] or 0):,.2f}"))
+            self.bills_model.set_rows(
+                (str(bill_id), str(vendor or ""), str(due or ""), _fmt_r(total))
+                for bill_id, vendor, due, total in rows)
         except Exception as e:
             print("[Dashboard] load_overdue_bills failed:", e)
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
-
-    def _load_top_customers(self):
-        conn = get_conn_safe()
+
+    def _load_top_customers(self, conn):
         if not conn:
-            self.tbl_customers.setRowCount(0)
+            self.customers_model.set_rows([])
             return
         try:
-            cur = conn.cursor()
-            if not self._table_exists(conn, "invoices"):
-                self.tbl_customers.setRowCount(0)
+            cur = self._tuple_cursor(conn)
+            if not self._table_exists("invoices"):
+                self.customers_model.set_rows([])
                 return
+            # aggregate and rank on the covering index first, then look up only the 8 names
             rows = cur.execute("""
-                SELECT COALESCE(c.name,'(Unnamed)') AS name, COUNT(i.id) AS invoices, IFNULL(SUM(i.total),0) AS total
-                FROM invoices i
-                LEFT JOIN customers c ON c.id = i.customer_id
-                GROUP BY c.id
-                ORDER BY total DESC
-                LIMIT 8
+                WITH agg AS (
+                    SELECT customer_id, COUNT(*) AS invoices, IFNULL(SUM(total),0) AS total
+                    FROM invoices
+                    GROUP BY customer_id
+                    ORDER BY total DESC
+                    LIMIT 8
+                )
+                SELECT COALESCE(c.name,'(Unnamed)') AS name, agg.invoices, agg.total
+                FROM agg
+                LEFT JOIN customers c ON c.id = agg.customer_id
+                ORDER BY agg.total DESC
             """).fetchall()
-            self.tbl_customers.setRowCount(len(rows))
-            for r, rr in enumerate(rows):
-                self.tbl_customers.setItem(r, 0, QTableWidgetItem(str(rr["name"] or "(Unnamed)")))
-                self.tbl_customers.setItem(r, 1, QTableWidgetItem(str(rr["invoices"] or 0)))
-                self.tbl_customers.setItem(r, 2, QTableWidgetItem(f"R{(rr['total'] or 0):,.2f}"))
+            self.customers_model.set_rows(
+                (str(name or "(Unnamed)"), str(invoices or 0), _fmt_r(total))
+                for name, invoices, total in rows)
         except Exception as e:
             print("[Dashboard] load_top_customers failed:", e)
-        finally:
-            try:
-                conn.close()
-            except Exception:
-                pass
 
     # -------------------------
     # Export & Print
@@ -492,25 +613,24 @@ class Dashboard(QWidget):
         path, _ = QFileDialog.getSaveFileName(self, "Export Dashboard Data", "dashboard.csv", "CSV Files (*.csv)")
         if not path:
             return
-        try:
-            with open(path, "w", newline="", encoding="utf-8") as f:
-                writer = csv.writer(f)
-                writer.writerow(["Metric", "Value"])
-                writer.writerow(["Bank Balance", self.kpi_bank.value_lbl.text()])
-                writer.writerow(["Income (12m)", self.kpi_income.value_lbl.text()])
-                writer.writerow(["Expenses (12m)", self.kpi_expenses.value_lbl.text()])
-                writer.writerow(["Net Profit (12m)", self.kpi_net.value_lbl.text()])
-                writer.writerow([])
-                writer.writerow(["Top Customers"])
-                for row in range(self.tbl_customers.rowCount()):
-                    writer.writerow([
-                        self.tbl_customers.item(row,0).text(),
-                        self.tbl_customers.item(row,1).text(),
-                        self.tbl_customers.item(row,2).text(),
-                    ])
+        # snapshot on the UI thread; the file is written on a pool thread
+        rows = [
+            ["Metric", "Value"],
+            ["Bank Balance", self.kpi_bank.value_lbl.text()],
+            ["Income (12m)", self.kpi_income.value_lbl.text()],
+            ["Expenses (12m)", self.kpi_expenses.value_lbl.text()],
+            ["Net Profit (12m)", self.kpi_net.value_lbl.text()],
+            [],
+            ["Top Customers"],
+            *self.customers_model.rows(),
+        ]
+        QThreadPool.globalInstance().start(CsvExportTask(path, rows, self._export_signals))
+
+    def _export_finished(self, path, error):
+        if error:
+            print("Export failed:", error)
+        else:
             print("Dashboard exported to", path)
-        except Exception as e:
-            print("Export failed:", e)
 
     def _print_dashboard(self):
         printer = QPrinter()
@@ -524,7 +644,7 @@ class Dashboard(QWidget):
     # -------------------------
     def simulate_profit(self, extra_revenue=0.0, extra_expense=0.0):
         try:
-            pl = profit_and_loss()
+            pl = self._pl()
             income = sum(i.get("balance",0) for i in pl.get("income",[])) + extra_revenue
             expenses = sum(e.get("balance",0) for e in pl.get("expenses",[])) + extra_expense
             gross = income - sum(i.get("balance",0) for i in pl.get("cogs",[]))
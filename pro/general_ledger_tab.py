@@ -3,19 +3,20 @@
 # Uses journal_entries/journal_lines and cash_book to display a unified general ledger per account.
 
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableWidget,
-    QTableWidgetItem, QPushButton, QHeaderView, QDateEdit, QComboBox
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTableView,
+    QPushButton, QHeaderView, QDateEdit, QComboBox
 )
-from PyQt6.QtCore import Qt, QDate
-from datetime import datetime
+from PyQt6.QtCore import Qt, QDate, QAbstractTableModel, QModelIndex
 import sqlite3
 import os
 
 # Import project's DB helpers
 try:
-    from shared.db import db_connection, get_conn, list_companies, get_current_company
+    from shared.db import db_connection, get_conn, get_pool, list_companies, get_current_company
 except Exception:
     # fallback if run as standalone during testing
+    def get_pool():
+        return None
     def get_conn():
         conn = sqlite3.connect(os.environ.get('LEDGER_DB', 'ledger.db'))
         conn.row_factory = sqlite3.Row
@@ -29,6 +30,97 @@ except Exception:
         return Ctx()
 
 
+# cash_book.account stores account text; it resolves by code first, then by name
+LEDGER_SQL = """
+    SELECT *, SUM(COALESCE(debit, 0) - COALESCE(credit, 0)) OVER (
+               ORDER BY entry_date, line_id, source ROWS UNBOUNDED PRECEDING) AS running_balance
+    FROM (
+        SELECT jl.id AS line_id, je.date AS entry_date, 'Journal' AS source, je.reference AS reference,
+               a.code || ' - ' || a.name AS account, jl.debit AS debit, jl.credit AS credit,
+               je.memo AS description, a.id AS account_id
+        FROM journal_entries je
+        JOIN journal_lines jl ON jl.journal_id = je.id
+        JOIN accounts a ON a.id = jl.account_id
+        WHERE je.date BETWEEN ? AND ?
+        UNION ALL
+        SELECT cb.id, cb.date, 'Cashbook', cb.reference,
+               COALESCE(a.code || ' - ' || a.name, cb.account), cb.debit, cb.credit,
+               cb.narration, a.id
+        FROM cash_book cb
+        LEFT JOIN accounts a ON a.id = COALESCE(
+            (SELECT id FROM accounts WHERE code = cb.account),
+            (SELECT MIN(id) FROM accounts WHERE name = cb.account))
+        WHERE cb.date BETWEEN ? AND ?
+    )
+    WHERE ? IS NULL OR account_id = ?
+    ORDER BY entry_date, line_id, source
+"""
+
+
+def ensure_ledger_indexes(conn):
+    cur = conn.cursor()
+    had_account_index = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_jl_account'").fetchone()
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_je_date ON journal_entries(date)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jl_journal ON journal_lines(journal_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_jl_account ON journal_lines(account_id)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_cb_date ON cash_book(date)")
+    # cash_book.account resolves by code (already UNIQUE) or by name
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_accounts_name ON accounts(name)")
+    if not had_account_index:
+        # refresh planner statistics once so the new indexes get picked up
+        cur.execute("ANALYZE")
+    conn.commit()
+
+
+LEDGER_HEADERS = [
+    "Date", "Source", "Reference", "Account", "Debit", "Credit", "Description", "Running Balance", "Line ID"
+]
+
+
+class LedgerModel(QAbstractTableModel):
+    """Ledger rows as preformatted tuples; the view only asks for the cells it paints."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(LEDGER_HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or role != Qt.ItemDataRole.DisplayRole:
+            return None
+        return self._rows[index.row()][index.column()]
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return LEDGER_HEADERS[section]
+        return None
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self.endResetModel()
+
+    def rows(self):
+        return self._rows
+
+
+def _read_connection():
+    # the company's pooled connection keeps its page cache warm between reloads
+    pool = get_pool()
+    return pool.read() if pool else db_connection()
+
+
+def _write_connection():
+    pool = get_pool()
+    return pool.write() if pool else db_connection()
+
+
 class GeneralLedgerTab(QWidget):
     """
     GENERAL LEDGER TAB — Integrated with NexLedger DB
@@ -44,6 +136,11 @@ class GeneralLedgerTab(QWidget):
 
     def __init__(self, parent=None):
         super().__init__(parent)
+        try:
+            with _write_connection() as conn:
+                ensure_ledger_indexes(conn)
+        except Exception as e:
+            print('[general_ledger] index check failed:', e)
         self.init_ui()
         self.load_accounts()
         self.load_ledger()
@@ -75,11 +172,9 @@ class GeneralLedgerTab(QWidget):
         layout.addLayout(filter_layout)
 
         # Ledger table
-        self.table = QTableWidget()
-        self.table.setColumnCount(9)
-        self.table.setHorizontalHeaderLabels([
-            "Date", "Source", "Reference", "Account", "Debit", "Credit", "Description", "Running Balance", "Line ID"
-        ])
+        self.model = LedgerModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.setColumnHidden(8, True)  # hide internal Line ID
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
         layout.addWidget(self.table)
@@ -99,7 +194,7 @@ class GeneralLedgerTab(QWidget):
     def load_accounts(self):
         # Load accounts as 'code - name'
         try:
-            with db_connection() as conn:
+            with _read_connection() as conn:
                 cur = conn.cursor()
                 cur.execute("SELECT id, code, name FROM accounts ORDER BY code")
                 accounts = cur.fetchall()
@@ -119,109 +214,45 @@ class GeneralLedgerTab(QWidget):
         to_date = self.to_date.date().toString("yyyy-MM-dd")
         selected_account_id = self.account_filter.currentData()
 
+        # journal lines and cash book lines, filtered and ordered by SQLite in one statement
         lines = []
-        # --- journal lines ---
         try:
-            with db_connection() as conn:
+            with _read_connection() as conn:
                 cur = conn.cursor()
-                cur.execute(
-                    "SELECT jl.id as line_id, je.date as entry_date, 'Journal' as source, je.reference as reference, "
-                    "a.code || ' - ' || a.name as account, jl.debit as debit, jl.credit as credit, je.memo as description, a.id as account_id "
-                    "FROM journal_entries je JOIN journal_lines jl ON jl.journal_id = je.id JOIN accounts a ON a.id = jl.account_id "
-                    "WHERE je.date BETWEEN ? AND ?",
-                    (from_date, to_date)
-                )
-                rows = cur.fetchall()
-                for r in rows:
-                    lines.append(dict(r))
-
-                # --- cash_book lines ---
-                # cash_book.account stores account text; we will try to match by code or name
-                cur.execute(
-                    "SELECT id as line_id, date as entry_date, 'Cashbook' as source, reference, account as account_text, debit, credit, narration as description "
-                    "FROM cash_book WHERE date BETWEEN ? AND ?",
-                    (from_date, to_date)
-                )
-                cb_rows = cur.fetchall()
-                # attempt to resolve account_text to account id and account label
-                for r in cb_rows:
-                    account_text = r['account'] or ''
-                    # try to find account by code or name
-                    cur.execute("SELECT id, code, name FROM accounts WHERE code = ? OR name = ? LIMIT 1", (account_text, account_text))
-                    a = cur.fetchone()
-                    if a:
-                        account_label = f"{a['code']} - {a['name']}"
-                        account_id = a['id']
-                    else:
-                        account_label = account_text
-                        account_id = None
-                    line = {
-                        'line_id': r['line_id'],
-                        'entry_date': r['entry_date'],
-                        'source': 'Cashbook',
-                        'reference': r['reference'],
-                        'account': account_label,
-                        'debit': r['debit'],
-                        'credit': r['credit'],
-                        'description': r['description'],
-                        'account_id': account_id
-                    }
-                    lines.append(line)
+                cur.execute(LEDGER_SQL, (from_date, to_date, from_date, to_date,
+                                         selected_account_id, selected_account_id))
+                lines = [dict(r) for r in cur.fetchall()]
         except Exception as e:
             print('[general_ledger] DB error:', e)
 
-        # Filter by selected account if provided
-        if selected_account_id:
-            lines = [L for L in lines if L.get('account_id') == selected_account_id]
-
-        # Sort by date then line_id
-        def parse_date(d):
-            try:
-                return datetime.fromisoformat(d)
-            except Exception:
-                try:
-                    return datetime.strptime(d, '%Y-%m-%d')
-                except Exception:
-                    return datetime.min
-
-        lines.sort(key=lambda x: (parse_date(x['entry_date']), x['line_id']))
-
-        # Populate table and compute running balance
-        self.table.setRowCount(len(lines))
-        running_balance = 0.0
-        for i, L in enumerate(lines):
+        # Format rows once; SQLite has already accumulated the running balance
+        rows = []
+        for L in lines:
             debit = float(L.get('debit') or 0)
             credit = float(L.get('credit') or 0)
-            running_balance += (debit - credit)
-
-            self.table.setItem(i, 0, QTableWidgetItem(str(L.get('entry_date'))))
-            self.table.setItem(i, 1, QTableWidgetItem(str(L.get('source'))))
-            self.table.setItem(i, 2, QTableWidgetItem(str(L.get('reference') or '')))
-            self.table.setItem(i, 3, QTableWidgetItem(str(L.get('account') or '')))
-            self.table.setItem(i, 4, QTableWidgetItem(('{:.2f}'.format(debit) if debit else '')))
-            self.table.setItem(i, 5, QTableWidgetItem(('{:.2f}'.format(credit) if credit else '')))
-            self.table.setItem(i, 6, QTableWidgetItem(str(L.get('description') or '')))
-            self.table.setItem(i, 7, QTableWidgetItem('{:.2f}'.format(running_balance)))
-            self.table.setItem(i, 8, QTableWidgetItem(str(L.get('line_id'))))
-
-        self.table.resizeRowsToContents()
+            rows.append((
+                str(L.get('entry_date')),
+                str(L.get('source')),
+                str(L.get('reference') or ''),
+                str(L.get('account') or ''),
+                '{:.2f}'.format(debit) if debit else '',
+                '{:.2f}'.format(credit) if credit else '',
+                str(L.get('description') or ''),
+                '{:.2f}'.format(L.get('running_balance') or 0),
+                str(L.get('line_id')),
+            ))
+        self.model.set_rows(rows)
 
     def export_csv(self):
         # Exports visible table to CSV in current directory
         import csv
-        rows = []
-        headers = [self.table.horizontalHeaderItem(c).text() for c in range(self.table.columnCount()) if not self.table.isColumnHidden(c)]
-        for r in range(self.table.rowCount()):
-            row = []
-            for c in range(self.table.columnCount()):
-                if self.table.isColumnHidden(c):
-                    continue
-                item = self.table.item(r, c)
-                row.append(item.text() if item else '')
-            rows.append(row)
+        visible_cols = [c for c in range(self.model.columnCount()) if not self.table.isColumnHidden(c)]
+        headers = [LEDGER_HEADERS[c] for c in visible_cols]
+        rows = self.model.rows()
         out = 'general_ledger_export.csv'
         with open(out, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(headers)
-            writer.writerows(rows)
+            # rows are streamed out of the model without building a second copy
+            writer.writerows([values[c] for c in visible_cols] for values in rows)
         print(f'Exported {len(rows)} rows to {out}')
@@ -1,4 +1,4 @@
-import pkg_resources
+from importlib.metadata import distributions
 
 # Only keep libraries relevant to NexLedger
 ALLOWED_PREFIXES = [
@@ -27,21 +27,19 @@ ALLOWED_PREFIXES = [
 ]
 
 # Convert to lowercase for consistent comparison
-ALLOWED_PREFIXES = [p.lower() for p in ALLOWED_PREFIXES]
+# (a tuple so str.startswith can test every prefix in one call)
+ALLOWED_PREFIXES = tuple(p.lower() for p in ALLOWED_PREFIXES)
 
 def is_relevant(package_name: str):
-    name = package_name.lower()
-    return any(name.startswith(prefix) for prefix in ALLOWED_PREFIXES)
+    return package_name.lower().startswith(ALLOWED_PREFIXES)
 
 def main():
-    installed_packages = pkg_resources.working_set
-    filtered = []
-
-    for dist in installed_packages:
-        if is_relevant(dist.project_name):
-            filtered.append(f"{dist.project_name}=={dist.version}")
-
-    filtered.sort()
+    # the same distribution can be visible on more than one sys.path entry
+    filtered = sorted({
+        f"{dist.metadata['Name']}=={dist.version}"
+        for dist in distributions()
+        if dist.metadata['Name'] and is_relevant(dist.metadata['Name'])
+    })
 
     with open("requirements.txt", "w") as f:
         f.write("\n".join(filtered))
@@ -1,7 +1,15 @@
+VAT_RATE = 0.15
+
+
+def vat_rate(self):
+    # registration is looked up once per invoice object, not per calculation
+    rate = getattr(self, "_vat_rate", None)
+    if rate is None:
+        rate = self._vat_rate = VAT_RATE if is_vat_registered() else 0.0
+    return rate
+
 def calculate_vat(self, subtotal):
-    if not is_vat_registered():
-        return 0.0
-    return round(subtotal * 0.15, 2)
+    return round(subtotal * self.vat_rate(), 2)
 
 def generate_invoice_pdf(self):
     # ... existing
@@ -3,20 +3,98 @@
 # Full-featured invoice list + editor modeled after modern accounting software
 
 import csv
-from functools import partial
+import re
+from collections import OrderedDict
 from datetime import datetime
 
+import numpy as np
+
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget,
     QTableWidgetItem, QLineEdit, QHeaderView, QDialog, QFormLayout,
-    QMessageBox, QComboBox, QTextEdit, QSizePolicy, QFileDialog, QFrame
+    QMessageBox, QComboBox, QTextEdit, QSizePolicy, QFileDialog, QFrame, QTableView,
+    QStyledItemDelegate, QStyleOptionButton, QStyle, QApplication
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QDate
-from PyQt6.QtGui import QFont
+from PyQt6.QtCore import Qt, pyqtSignal, QDate, QAbstractTableModel, QModelIndex, QRect, QEvent, QTimer
+from PyQt6.QtGui import QFont, QColor
 
-from shared.db import get_conn_safe
+from shared.db import get_pool
 
 PAGE_SIZE = 20
+PAGE_CACHE_SIZE = 32
+SEARCH_DEBOUNCE_MS = 250
+_DATE_SEARCH = re.compile(r"^\d{4}(-\d{0,2}){0,2}$")
+
+
+def ensure_invoice_indexes(conn):
+    cur = conn.cursor()
+    had_status_index = cur.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='index' AND name='idx_inv_status_date'").fetchone()
+    # status-filtered pages read newest first
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_inv_status_date ON invoices(status, date DESC)")
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_inv_items_invoice ON invoice_items(invoice_id)")
+    if not had_status_index:
+        cur.execute("ANALYZE")
+    conn.commit()
+
+
+def ensure_invoice_search(conn):
+    """Full-text index over invoice customer name and notes, kept current by triggers."""
+    cur = conn.cursor()
+    exists = cur.execute("SELECT 1 FROM sqlite_master WHERE name='invoices_fts'").fetchone()
+    cur.execute("CREATE VIRTUAL TABLE IF NOT EXISTS invoices_fts USING fts5(customer, notes)")
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_invoices_fts_ins AFTER INSERT ON invoices
+        BEGIN
+            INSERT INTO invoices_fts(rowid, customer, notes)
+            VALUES (NEW.id, (SELECT name FROM customers WHERE id = NEW.customer_id), NEW.notes);
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_invoices_fts_upd AFTER UPDATE OF customer_id, notes ON invoices
+        BEGIN
+            DELETE FROM invoices_fts WHERE rowid = OLD.id;
+            INSERT INTO invoices_fts(rowid, customer, notes)
+            VALUES (NEW.id, (SELECT name FROM customers WHERE id = NEW.customer_id), NEW.notes);
+        END
+    """)
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_invoices_fts_del AFTER DELETE ON invoices
+        BEGIN
+            DELETE FROM invoices_fts WHERE rowid = OLD.id;
+        END
+    """)
+    # a renamed customer re-indexes their invoices
+    cur.execute("""
+        CREATE TRIGGER IF NOT EXISTS trg_customers_fts_upd AFTER UPDATE OF name ON customers
+        BEGIN
+            DELETE FROM invoices_fts WHERE rowid IN (SELECT id FROM invoices WHERE customer_id = NEW.id);
+            INSERT INTO invoices_fts(rowid, customer, notes)
+            SELECT id, NEW.name, notes FROM invoices WHERE customer_id = NEW.id;
+        END
+    """)
+    if not exists:
+        cur.execute("""
+            INSERT INTO invoices_fts(rowid, customer, notes)
+            SELECT i.id, c.name, i.notes FROM invoices i LEFT JOIN customers c ON c.id = i.customer_id
+        """)
+    conn.commit()
+
+
+def search_clause(text):
+    """SQL condition and params for the invoice search box: id, date prefix or full-text."""
+    if not text:
+        return "", []
+    if _DATE_SEARCH.match(text):
+        if text.isdigit():
+            # a bare year may also be an invoice number
+            return "(i.id = ? OR i.date GLOB ?)", [int(text), text + "*"]
+        return "i.date GLOB ?", [text + "*"]
+    if text.isdigit():
+        return "i.id = ?", [int(text)]
+    # every word must match as a prefix; quotes keep FTS operators out of user input
+    terms = " ".join('"%s"*' % t.replace('"', '""') for t in text.split())
+    return "i.id IN (SELECT rowid FROM invoices_fts WHERE invoices_fts MATCH ?)", [terms]
 
 
 # -----------------------------
@@ -28,6 +106,11 @@ class InvoiceEditor(QDialog):
     def __init__(self, invoice_id=None, parent=None):
         super().__init__(parent)
         self.invoice_id = invoice_id
+        # per-row net and VAT plus their sums, updated by delta on each cell edit
+        self._line_nets = []
+        self._line_vats = []
+        self._sub = 0.0
+        self._vat = 0.0
         self.setWindowTitle("Edit Invoice" if invoice_id else "New Invoice")
         self.setMinimumSize(760, 600)
         self._build_ui()
@@ -87,125 +170,255 @@ class InvoiceEditor(QDialog):
         self.items.cellChanged.connect(self._on_item_changed)
 
     def _load_customers(self):
-        conn = get_conn_safe()
-        if not conn:
+        pool = get_pool()
+        if not pool:
             return
-        try:
+        with pool.read() as conn:
             rows = conn.execute("SELECT id, name FROM customers ORDER BY name").fetchall()
             for r in rows:
                 self.customer_combo.addItem(r["name"], r["id"])
-        finally:
-            try: conn.close()
-            except: pass
 
     def _add_line(self):
         r = self.items.rowCount()
+        self.items.blockSignals(True)
         self.items.insertRow(r)
         self.items.setItem(r, 0, QTableWidgetItem(""))
         self.items.setItem(r, 1, QTableWidgetItem("1"))
         self.items.setItem(r, 2, QTableWidgetItem("0.00"))
         self.items.setItem(r, 3, QTableWidgetItem("15"))
         self.items.setItem(r, 4, QTableWidgetItem("0.00"))
+        self.items.blockSignals(False)
+        # a fresh line is 1 x 0.00, so the totals are unchanged
+        self._line_nets.append(0.0)
+        self._line_vats.append(0.0)
 
     def _on_item_changed(self, row, col):
-        # recalc total for the line and overall totals
-        try:
-            qty = float(self.items.item(row, 1).text()) if self.items.item(row, 1) else 0
-            price = float(self.items.item(row, 2).text()) if self.items.item(row, 2) else 0
-            vat_pct = float(self.items.item(row, 3).text()) if self.items.item(row, 3) else 0
-            line_total = qty * price * (1 + vat_pct / 100)
+        if col in (0, 4):
+            return  # description and the computed total do not feed the sums
+        values = self._line_values(row)
+        qty, price, vat_pct = values or (0.0, 0.0, 0.0)
+        net = qty * price
+        vat = net * vat_pct / 100
+        while len(self._line_nets) <= row:
+            self._line_nets.append(0.0)
+            self._line_vats.append(0.0)
+        self._sub += net - self._line_nets[row]
+        self._vat += vat - self._line_vats[row]
+        self._line_nets[row] = net
+        self._line_vats[row] = vat
+        total_item = self.items.item(row, 4)
+        if values is not None and total_item is not None:
             self.items.blockSignals(True)
-            self.items.setItem(row, 4, QTableWidgetItem(f"{line_total:.2f}"))
+            total_item.setText(f"{net + vat:.2f}")
             self.items.blockSignals(False)
+        self._show_totals()
+
+    def _line_values(self, r):
+        try:
+            item = self.items.item
+            return (float(item(r, 1).text()), float(item(r, 2).text()), float(item(r, 3).text()))
         except Exception:
-            pass
-        self._recalc_totals()
+            return None
+
+    def _show_totals(self):
+        self.lbl_sub.setText(f"Sub-total: R{self._sub:,.2f}")
+        self.lbl_vat.setText(f"VAT: R{self._vat:,.2f}")
+        self.lbl_total.setText(f"Total: R{self._sub + self._vat:,.2f}")
 
     def _recalc_totals(self):
-        sub = 0.0
-        vat = 0.0
-        for r in range(self.items.rowCount()):
-            try:
-                qty = float(self.items.item(r, 1).text())
-                price = float(self.items.item(r, 2).text())
-                vat_pct = float(self.items.item(r, 3).text())
-                line_net = qty * price
-                sub += line_net
-                vat += line_net * (vat_pct / 100)
-            except Exception:
-                pass
-        total = sub + vat
-        self.lbl_sub.setText(f"Sub-total: R{sub:,.2f}")
-        self.lbl_vat.setText(f"VAT: R{vat:,.2f}")
-        self.lbl_total.setText(f"Total: R{total:,.2f}")
-        return sub, vat, total
+        # full rebuild after an invoice is loaded; edits after that apply per-line deltas and _save reads the sums
+        values = [self._line_values(r) or (0.0, 0.0, 0.0) for r in range(self.items.rowCount())]
+        lines = np.array(values, dtype=np.float64).reshape(-1, 3)
+        line_net = lines[:, 0] * lines[:, 1]
+        line_vat = line_net * lines[:, 2] / 100.0
+        self._line_nets = line_net.tolist()
+        self._line_vats = line_vat.tolist()
+        self._sub = float(line_net.sum())
+        self._vat = float(line_vat.sum())
+        self._show_totals()
+        return self._sub, self._vat, self._sub + self._vat
 
     def _load_invoice(self):
-        conn = get_conn_safe()
-        if not conn:
+        pool = get_pool()
+        if not pool:
             return
-        try:
-            cur = conn.cursor()
-            inv = cur.execute("SELECT * FROM invoices WHERE id=?", (self.invoice_id,)).fetchone()
-            if not inv:
-                return
-            self.date_edit.setText(inv["date"])
-            idx = self.customer_combo.findData(inv["customer_id"])
-            if idx >= 0:
-                self.customer_combo.setCurrentIndex(idx)
-            self.notes.setPlainText(inv["notes"] or "")
-            # load items
-            items = cur.execute("SELECT description, qty, price, vat FROM invoice_items WHERE invoice_id=?", (self.invoice_id,)).fetchall()
-            for it in items:
-                r = self.items.rowCount()
-                self.items.insertRow(r)
-                self.items.setItem(r, 0, QTableWidgetItem(it["description"]))
-                self.items.setItem(r, 1, QTableWidgetItem(str(it["qty"])))
-                self.items.setItem(r, 2, QTableWidgetItem(str(it["price"])))
-                self.items.setItem(r, 3, QTableWidgetItem(str(it["vat"])))
-                self.items.setItem(r, 4, QTableWidgetItem(str(it["qty"] * it["price"] * (1 + it["vat"]/100))))
-            self._recalc_totals()
-        finally:
-            try: conn.close()
-            except: pass
+        # header columns repeat on every item row; an invoice without items yields one row of NULLs
+        with pool.read() as conn:
+            rows = conn.execute("""
+                SELECT i.date, i.customer_id, i.notes, ii.id AS item_id,
+                       ii.description, ii.qty, ii.price, ii.vat
+                FROM invoices i
+                LEFT JOIN invoice_items ii ON ii.invoice_id = i.id
+                WHERE i.id = ?
+                ORDER BY ii.id
+            """, (self.invoice_id,)).fetchall()
+        if not rows:
+            return
+        inv = rows[0]
+        self.date_edit.setText(inv["date"])
+        idx = self.customer_combo.findData(inv["customer_id"])
+        if idx >= 0:
+            self.customer_combo.setCurrentIndex(idx)
+        self.notes.setPlainText(inv["notes"] or "")
+        # load items
+        set_item = self.items.setItem
+        for it in rows:
+            if it["item_id"] is None:
+                continue
+            r = self.items.rowCount()
+            self.items.insertRow(r)
+            qty, price, vat_pct = it["qty"], it["price"], it["vat"]
+            set_item(r, 0, QTableWidgetItem(it["description"]))
+            set_item(r, 1, QTableWidgetItem(str(qty)))
+            set_item(r, 2, QTableWidgetItem(str(price)))
+            set_item(r, 3, QTableWidgetItem(str(vat_pct)))
+            set_item(r, 4, QTableWidgetItem(str(qty * price * (1 + vat_pct / 100))))
+        self._recalc_totals()
 
     def _save(self):
-        conn = get_conn_safe()
-        if not conn:
+        pool = get_pool()
+        if not pool:
             QMessageBox.critical(self, "Error", "Database not available")
             return
         try:
-            cur = conn.cursor()
-            sub, vat, total = self._recalc_totals()
+            # the running sums are already current from _recalc_totals/_on_item_changed
+            total = self._sub + self._vat
             date = self.date_edit.text()
             cust = self.customer_combo.currentData()
             notes = self.notes.toPlainText()
 
-            if self.invoice_id:
-                cur.execute("UPDATE invoices SET customer_id=?, date=?, notes=?, total=?, status=? WHERE id=?",
-                            (cust, date, notes, total, 'Sent', self.invoice_id))
-                cur.execute("DELETE FROM invoice_items WHERE invoice_id=?", (self.invoice_id,))
-            else:
-                cur.execute("INSERT INTO invoices (customer_id, date, notes, total, status) VALUES (?,?,?,?, 'Draft')",
-                            (cust, date, notes, total))
-                self.invoice_id = cur.lastrowid
-
+            item = self.items.item
+            items = []
             for r in range(self.items.rowCount()):
-                desc = self.items.item(r, 0).text() if self.items.item(r, 0) else ""
-                qty = float(self.items.item(r, 1).text()) if self.items.item(r, 1) else 0
-                price = float(self.items.item(r, 2).text()) if self.items.item(r, 2) else 0
-                vat_pct = float(self.items.item(r, 3).text()) if self.items.item(r, 3) else 0
-                cur.execute("INSERT INTO invoice_items (invoice_id, description, qty, price, vat) VALUES (?,?,?,?,?)",
-                            (self.invoice_id, desc, qty, price, vat_pct))
-
-            conn.commit()
+                it_desc, it_qty, it_price, it_vat = (item(r, c) for c in range(4))
+                items.append((it_desc.text() if it_desc else "",
+                              float(it_qty.text()) if it_qty else 0,
+                              float(it_price.text()) if it_price else 0,
+                              float(it_vat.text()) if it_vat else 0))
+
+            # header, item delete and item inserts commit together in one transaction
+            with pool.write() as conn:
+                cur = conn.cursor()
+                invoice_id = self.invoice_id
+                if invoice_id:
+                    cur.execute("UPDATE invoices SET customer_id=?, date=?, notes=?, total=?, status=? WHERE id=?",
+                                (cust, date, notes, total, 'Sent', invoice_id))
+                    cur.execute("DELETE FROM invoice_items WHERE invoice_id=?", (invoice_id,))
+                else:
+                    cur.execute("INSERT INTO invoices (customer_id, date, notes, total, status) VALUES (?,?,?,?, 'Draft')",
+                                (cust, date, notes, total))
+                    invoice_id = cur.lastrowid
+                cur.executemany("INSERT INTO invoice_items (invoice_id, description, qty, price, vat) VALUES (?,?,?,?,?)",
+                                [(invoice_id,) + item for item in items])
+
+            self.invoice_id = invoice_id
             self.saved.emit()
             self.accept()
         except Exception as e:
             QMessageBox.critical(self, "Save failed", str(e))
-        finally:
-            try: conn.close()
-            except: pass
+
+
+# -----------------------------
+# Invoices Table Model
+# -----------------------------
+INVOICE_HEADERS = ["ID", "Customer", "Date", "Status", "Total", "Actions"]
+STATUS_COLUMN = 3
+ACTIONS_COLUMN = 5
+STATUS_COLORS = {
+    'Draft': QColor(Qt.GlobalColor.lightGray),
+    'Sent': QColor(Qt.GlobalColor.yellow),
+    'Overdue': QColor(Qt.GlobalColor.red),
+    'Paid': QColor(Qt.GlobalColor.green),
+}
+ROW_FLAGS = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+
+
+class InvoicesModel(QAbstractTableModel):
+    """One page of invoices; display strings and status colour are computed once per row."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._ids = []
+        self._display = []
+        self._colors = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._display)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(INVOICE_HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._display[index.row()][index.column()]
+        if role == Qt.ItemDataRole.UserRole:
+            return self._ids[index.row()]
+        if role == Qt.ItemDataRole.BackgroundRole and index.column() == STATUS_COLUMN:
+            return self._colors[index.row()]
+        return None
+
+    def flags(self, index):
+        # every cell is read-only; the flag set is built once at import
+        return ROW_FLAGS if index.isValid() else Qt.ItemFlag.NoItemFlags
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return INVOICE_HEADERS[section]
+        return None
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._ids = [row['id'] for row in rows]
+        self._display = [(
+            str(row['id']),
+            str(row['customer'] or '(Unknown)'),
+            str(row['date']),
+            str(row['status']),
+            f"R{(row['total'] or 0):,.2f}",
+            '',
+        ) for row in rows]
+        self._colors = [STATUS_COLORS.get(row['status']) for row in rows]
+        self.endResetModel()
+
+    def invoice_id(self, row):
+        return self._ids[row] if 0 <= row < len(self._ids) else None
+
+
+class ActionsDelegate(QStyledItemDelegate):
+    """Paints Edit / Send / Mark Paid buttons in the actions column instead of real widgets.
+    Clicks are reported with the invoice id taken from the row's UserRole."""
+    LABELS = ("Edit", "Send", "Mark Paid")
+    editRequested = pyqtSignal(int)
+    sendRequested = pyqtSignal(int)
+    payRequested = pyqtSignal(int)
+
+    def _button_rects(self, rect):
+        w = rect.width() // len(self.LABELS)
+        return [QRect(rect.left() + i * w + 2, rect.top() + 2, w - 4, rect.height() - 4)
+                for i in range(len(self.LABELS))]
+
+    def paint(self, painter, option, index):
+        style = QApplication.style()
+        for label, rect in zip(self.LABELS, self._button_rects(option.rect)):
+            btn = QStyleOptionButton()
+            btn.rect = rect
+            btn.text = label
+            btn.state = QStyle.StateFlag.State_Enabled
+            style.drawControl(QStyle.ControlElement.CE_PushButton, btn, painter)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease:
+            pos = event.position().toPoint()
+            signals = (self.editRequested, self.sendRequested, self.payRequested)
+            for signal, rect in zip(signals, self._button_rects(option.rect)):
+                if rect.contains(pos):
+                    inv_id = index.data(Qt.ItemDataRole.UserRole)
+                    if inv_id is not None:
+                        signal.emit(inv_id)
+                    return True
+        return super().editorEvent(event, model, option, index)
 
 
 # -----------------------------
@@ -215,9 +428,29 @@ class InvoicesTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.page = 0
+        # (search, status, page) -> rows, most recent last; totals per (search, status)
+        self._page_cache = OrderedDict()
+        self._totals = {}
+        self._cache_fingerprint = None  # database state the cached pages were read from
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DEBOUNCE_MS)
+        self._search_timer.timeout.connect(self._do_search_refresh)
+        self._init_schema()
         self.build_ui()
         self.refresh()
 
+    def _init_schema(self):
+        pool = get_pool()
+        if not pool:
+            return
+        try:
+            with pool.write() as conn:
+                ensure_invoice_indexes(conn)
+                ensure_invoice_search(conn)
+        except Exception as e:
+            print("[InvoicesTab] index check failed:", e)
+
     def build_ui(self):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(12,12,12,12)
@@ -250,12 +483,18 @@ class InvoicesTab(QWidget):
         layout.addLayout(header)
 
         # Table
-        self.table = QTableWidget()
-        self.table.setColumnCount(6)
-        self.table.setHorizontalHeaderLabels(["ID", "Customer", "Date", "Status", "Total", "Actions"])
+        self.model = InvoicesModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
-        self.table.setSelectionBehavior(QTableWidget.SelectionBehavior.SelectRows)
-        self.table.itemDoubleClicked.connect(self._row_open)
+        self.table.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+        self.table.doubleClicked.connect(self._row_open)
+        self.actions = ActionsDelegate(self.table)
+        self.actions.editRequested.connect(self._open_editor_by_id)
+        self.actions.sendRequested.connect(self._send_invoice)
+        self.actions.payRequested.connect(self._mark_paid)
+        self.table.setItemDelegateForColumn(ACTIONS_COLUMN, self.actions)
         layout.addWidget(self.table)
 
         # Pager
@@ -269,6 +508,10 @@ class InvoicesTab(QWidget):
         layout.addLayout(pager)
 
     def _on_search_changed(self):
+        # restart the timer so only the last keystroke in a burst refreshes
+        self._search_timer.start()
+
+    def _do_search_refresh(self):
         self.page = 0
         self.refresh()
 
@@ -283,17 +526,15 @@ class InvoicesTab(QWidget):
 
     def _new_invoice(self):
         dlg = InvoiceEditor(None, self)
-        dlg.saved.connect(self.refresh)
+        dlg.saved.connect(self.reload)
         dlg.exec()
 
-    def _row_open(self, item):
+    def _row_open(self, index):
         try:
-            row = item.row()
-            id_item = self.table.item(row, 0)
-            if id_item:
-                inv_id = int(id_item.text())
+            inv_id = self.model.invoice_id(index.row())
+            if inv_id is not None:
                 dlg = InvoiceEditor(inv_id, self)
-                dlg.saved.connect(self.refresh)
+                dlg.saved.connect(self.reload)
                 dlg.exec()
         except Exception as e:
             print("Open invoice failed:", e)
@@ -302,12 +543,12 @@ class InvoicesTab(QWidget):
         path, _ = QFileDialog.getSaveFileName(self, "Export Invoices", "invoices.csv", "CSV Files (*.csv)")
         if not path:
             return
-        conn = get_conn_safe()
-        if not conn:
+        pool = get_pool()
+        if not pool:
             return
         try:
-            cur = conn.cursor()
-            rows = cur.execute("SELECT i.id, c.name as customer, i.date, i.status, i.total FROM invoices i LEFT JOIN customers c ON c.id=i.customer_id ORDER BY i.date DESC").fetchall()
+            with pool.read() as conn:
+                rows = conn.execute("SELECT i.id, c.name as customer, i.date, i.status, i.total FROM invoices i LEFT JOIN customers c ON c.id=i.customer_id ORDER BY i.date DESC").fetchall()
             with open(path, 'w', newline='', encoding='utf-8') as f:
                 w = csv.writer(f)
                 w.writerow(["ID","Customer","Date","Status","Total"])
@@ -316,119 +557,98 @@ class InvoicesTab(QWidget):
             QMessageBox.information(self, "Exported", f"Invoices exported to {path}")
         except Exception as e:
             QMessageBox.critical(self, "Export failed", str(e))
-        finally:
-            try: conn.close()
-            except: pass
+
+    def reload(self):
+        """Drops cached pages and totals (after any invoice write) and refreshes."""
+        self._page_cache.clear()
+        self._totals.clear()
+        self.refresh()
+
+    def _query_page(self, search, status, page):
+        pool = get_pool()
+        # writes from other tabs (or FTS re-indexing on a customer rename) change the file
+        fingerprint = (pool.db_path, pool.fingerprint())
+        if fingerprint != self._cache_fingerprint:
+            self._page_cache.clear()
+            self._totals.clear()
+            self._cache_fingerprint = fingerprint
+
+        key = (search, status, page)
+        rows = self._page_cache.get(key)
+        if rows is not None:
+            self._page_cache.move_to_end(key)
+            return rows, self._totals[(search, status)]
+
+        clauses = []
+        params = []
+        if status != "All":
+            clauses.append("i.status = ?")
+            params.append(status)
+        search_sql, search_params = search_clause(search)
+        if search_sql:
+            clauses.append(search_sql)
+            params += search_params
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        sql = f"""
+            SELECT i.id, c.name as customer, i.date, i.status, i.total
+            FROM invoices i
+            LEFT JOIN customers c ON c.id=i.customer_id
+            {where}
+            ORDER BY i.date DESC
+            LIMIT ? OFFSET ?
+        """
+
+        with pool.read() as conn:
+            # the match count only changes with the filter, not with the page
+            if (search, status) not in self._totals:
+                count_sql = f"SELECT COUNT(*) FROM invoices i LEFT JOIN customers c ON c.id=i.customer_id {where}"
+                self._totals[(search, status)] = conn.execute(count_sql, params).fetchone()[0]
+            rows = conn.execute(sql, params + [PAGE_SIZE, page * PAGE_SIZE]).fetchall()
+
+        self._page_cache[key] = rows
+        if len(self._page_cache) > PAGE_CACHE_SIZE:
+            self._page_cache.popitem(last=False)
+            live = {k[:2] for k in self._page_cache}
+            self._totals = {k: v for k, v in self._totals.items() if k in live}
+        return rows, self._totals[(search, status)]
 
     def refresh(self):
-        conn = get_conn_safe()
-        if not conn:
+        if not get_pool():
             return
         try:
-            cur = conn.cursor()
-            search = f"%{self.search.text().strip()}%"
+            search = self.search.text().strip()
             status = self.filter_combo.currentText()
-
-            where = "1=1"
-            params = []
-            if status != "All":
-                where = "status = ?"
-                params.append(status)
-
-            where = f"WHERE {where} AND (i.id LIKE ? OR c.name LIKE ? OR i.notes LIKE ? OR i.date LIKE ?)"
-            params = params + [search, search, search, search]
-
-            count_sql = f"SELECT COUNT(1) as cnt FROM invoices i LEFT JOIN customers c ON c.id=i.customer_id {where}"
-            total = cur.execute(count_sql, params).fetchone()[0]
-
-            offset = self.page * PAGE_SIZE
-            limit = PAGE_SIZE
-
-            sql = f"""
-                SELECT i.id, c.name as customer, i.date, i.status, i.total
-                FROM invoices i
-                LEFT JOIN customers c ON c.id=i.customer_id
-                {where}
-                ORDER BY i.date DESC
-                LIMIT ? OFFSET ?
-            """
-
-            rows = cur.execute(sql, params + [limit, offset]).fetchall()
-
-            self.table.setRowCount(len(rows))
-            for r, row in enumerate(rows):
-                inv_id = row['id']
-                self.table.setItem(r, 0, QTableWidgetItem(str(inv_id)))
-                self.table.setItem(r, 1, QTableWidgetItem(str(row['customer'] or '(Unknown)')))
-                self.table.setItem(r, 2, QTableWidgetItem(str(row['date'])))
-
-                # Status with color badge
-                status_item = QTableWidgetItem(str(row['status']))
-                status_item.setFlags(status_item.flags() & ~Qt.ItemFlag.ItemIsEditable)
-                if row['status'] == 'Draft':
-                    status_item.setBackground(Qt.GlobalColor.lightGray)
-                elif row['status'] == 'Sent':
-                    status_item.setBackground(Qt.GlobalColor.yellow)
-                elif row['status'] == 'Overdue':
-                    status_item.setBackground(Qt.GlobalColor.red)
-                elif row['status'] == 'Paid':
-                    status_item.setBackground(Qt.GlobalColor.green)
-                self.table.setItem(r, 3, status_item)
-
-                self.table.setItem(r, 4, QTableWidgetItem(f"R{(row['total'] or 0):,.2f}"))
-
-                # Actions: Edit, Send, Mark Paid
-                w = QWidget()
-                h = QHBoxLayout(w)
-                h.setContentsMargins(0,0,0,0)
-                btn_edit = QPushButton('Edit')
-                btn_send = QPushButton('Send')
-                btn_pay = QPushButton('Mark Paid')
-                btn_edit.clicked.connect(partial(self._open_editor_by_id, inv_id))
-                btn_send.clicked.connect(partial(self._send_invoice, inv_id))
-                btn_pay.clicked.connect(partial(self._mark_paid, inv_id))
-                h.addWidget(btn_edit); h.addWidget(btn_send); h.addWidget(btn_pay)
-                self.table.setCellWidget(r, 5, w)
-
+            rows, total = self._query_page(search, status, self.page)
+            self.model.set_rows(rows)
             self.lbl_page.setText(f"Page: {self.page+1} / {max(1, (total-1)//PAGE_SIZE + 1)}")
 
         except Exception as e:
             print('[InvoicesTab] refresh failed:', e)
-        finally:
-            try: conn.close()
-            except: pass
 
     # helpers
     def _open_editor_by_id(self, inv_id):
         dlg = InvoiceEditor(inv_id, self)
-        dlg.saved.connect(self.refresh)
+        dlg.saved.connect(self.reload)
         dlg.exec()
 
     def _send_invoice(self, inv_id):
         # stub: set status to Sent (real implementation: email + PDF)
-        conn = get_conn_safe()
-        if not conn:
+        pool = get_pool()
+        if not pool:
             return
-        try:
+        with pool.write() as conn:
             conn.execute("UPDATE invoices SET status='Sent' WHERE id=?", (inv_id,))
-            conn.commit()
-            QMessageBox.information(self, 'Sent', f'Invoice {inv_id} marked as Sent')
-            self.refresh()
-        finally:
-            try: conn.close()
-            except: pass
+        QMessageBox.information(self, 'Sent', f'Invoice {inv_id} marked as Sent')
+        self.reload()
 
     def _mark_paid(self, inv_id):
-        conn = get_conn_safe()
-        if not conn:
+        pool = get_pool()
+        if not pool:
             return
-        try:
+        with pool.write() as conn:
             conn.execute("UPDATE invoices SET status='Paid' WHERE id=?", (inv_id,))
-            conn.commit()
-            QMessageBox.information(self, 'Paid', f'Invoice {inv_id} marked as Paid')
-            self.refresh()
-        finally:
-            try: conn.close()
-            except: pass
+        QMessageBox.information(self, 'Paid', f'Invoice {inv_id} marked as Paid')
+        self.reload()
 
 # End of InvoicesTab
@@ -1,14 +1,18 @@
 # pro/journal_tab.py
 # Full Journal Tab (Integrated Journal Engine) – 2025-11-18
-# Requires: PyQt6, shared.db.get_conn(), shared.theme.get_widget_style()
+# Requires: PyQt6, shared.db.get_pool(), shared.theme.get_widget_style()
 
 from PyQt6.QtWidgets import (
-    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableWidget, QTableWidgetItem,
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableView, QStyledItemDelegate,
     QComboBox, QDoubleSpinBox, QLineEdit, QTextEdit, QDateEdit, QMessageBox, QHeaderView
 )
-from PyQt6.QtCore import Qt, QDate
+from PyQt6.QtCore import (
+    Qt, QDate, QAbstractTableModel, QModelIndex, QObject, QRunnable, QThreadPool, pyqtSignal
+)
+from PyQt6.QtGui import QStandardItemModel, QStandardItem
+import sqlite3
 from datetime import datetime
-from shared.db import get_conn
+from shared.db import get_pool, on_close_all_dbs
 from shared.theme import get_widget_style
 
 # ---------------------------
@@ -19,20 +23,54 @@ def ensure_table(conn, ddl):
     cur.execute(ddl)
     conn.commit()
 
+# (id(conn), table) -> frozenset of column names; a missing table is not cached
+_COLUMN_CACHE = {}
+
+def _table_columns(conn, table):
+    key = (id(conn), table)
+    cols = _COLUMN_CACHE.get(key)
+    if cols is None:
+        cols = frozenset(r[1] for r in conn.execute(f"PRAGMA table_info({table})"))
+        if cols:
+            _COLUMN_CACHE[key] = cols
+    return cols
+
 def table_has_column(conn, table, column):
-    cur = conn.cursor()
-    cur.execute(f"PRAGMA table_info({table})")
-    cols = [r[1] for r in cur.fetchall()]
-    return column in cols
+    return column in _table_columns(conn, table)
 
 def add_column_if_missing(conn, table, column, ddl_fragment):
     if not table_has_column(conn, table, column):
         cur = conn.cursor()
         cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {ddl_fragment}")
         conn.commit()
+        _COLUMN_CACHE.pop((id(conn), table), None)
+
+# company databases whose journal schema has been checked in this process
+_SCHEMA_READY = set()
+
+def _journal_pool():
+    # the company's process-wide pool: one locked writer plus read-only connections
+    pool = get_pool()
+    if pool is None:
+        raise ValueError("No company selected")
+    if pool.db_path not in _SCHEMA_READY:
+        with pool.write() as conn:
+            _create_journal_tables(conn)
+        _SCHEMA_READY.add(pool.db_path)
+    return pool
+
+def _reset_schema_caches():
+    # the pools are gone; a company recreated under the same path needs its schema again
+    _SCHEMA_READY.clear()
+    _COLUMN_CACHE.clear()
+
+on_close_all_dbs(_reset_schema_caches)
 
 def init_journal_schema():
-    conn = get_conn()
+    """Creates the journal tables for the open company; runs lazily on first use otherwise."""
+    _journal_pool()
+
+def _create_journal_tables(conn):
     # Main header + lines for general journals (separate from 'journals' created by bank module)
     ensure_table(conn, """
         CREATE TABLE IF NOT EXISTS journal_headers (
@@ -58,7 +96,8 @@ def init_journal_schema():
             FOREIGN KEY (gl_account_id) REFERENCES gl_accounts(id)
         );
     """)
-    # keep backwards-compatible 'journals' / 'journal_lines' used by bank opening if present
+    # keep backwards-compatible 'journals' used by bank opening if present
+    # (its journal_id-keyed journal_lines DDL lives in settings_bank_accounts)
     ensure_table(conn, """
         CREATE TABLE IF NOT EXISTS journals (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -67,61 +106,98 @@ def init_journal_schema():
             created_on TEXT DEFAULT (datetime('now'))
         );
     """)
+    # per-prefix, per-year reference counters
+    had_sequences = table_has_column(conn, "journal_sequences", "seq")
     ensure_table(conn, """
-        CREATE TABLE IF NOT EXISTS journal_lines (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            journal_id INTEGER NOT NULL,
-            gl_account_id INTEGER NOT NULL,
-            debit REAL DEFAULT 0,
-            credit REAL DEFAULT 0,
-            narrative TEXT,
-            FOREIGN KEY (journal_id) REFERENCES journals(id),
-            FOREIGN KEY (gl_account_id) REFERENCES gl_accounts(id)
+        CREATE TABLE IF NOT EXISTS journal_sequences (
+            prefix TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            seq INTEGER NOT NULL,
+            PRIMARY KEY (prefix, year)
         );
     """)
-    conn.close()
-
-# initialize schema at import time
-try:
-    init_journal_schema()
-except Exception as e:
-    print("Warning: init_journal_schema failed:", e)
+    if not had_sequences:
+        # continue from the old MAX(id)-based numbering so references stay unique
+        year = datetime.now().year
+        conn.executemany("""
+            INSERT OR IGNORE INTO journal_sequences (prefix, year, seq)
+            SELECT ?, ?, id FROM journal_headers ORDER BY id DESC LIMIT 1
+        """, [("JRNL", year), ("REV", year)])
+        conn.commit()
+    # line lookups by header (reversals) and date-ordered header scans
+    ensure_table(conn, "CREATE INDEX IF NOT EXISTS ix_jh_date ON journal_headers(journal_date)")
+    # journal_lines may be the company schema's version without header_id
+    if table_has_column(conn, "journal_lines", "header_id"):
+        ensure_table(conn, "CREATE INDEX IF NOT EXISTS ix_jl_header ON journal_lines(header_id)")
 
 # ---------------------------
 # Utility functions
 # ---------------------------
+def _cents(v):
+    """Amount as integer cents, so balance checks compare exactly."""
+    return int(round(float(v or 0) * 100))
+
 def format_currency(v):
     try:
         return f"{float(v):,.2f}"
     except:
         return "0.00"
 
+_NEXT_SEQ_SQL = """
+    INSERT INTO journal_sequences (prefix, year, seq) VALUES (?, ?, 1)
+    ON CONFLICT (prefix, year) DO UPDATE SET seq = seq + 1
+"""
+# RETURNING needs SQLite 3.35; older builds read the counter back in the same transaction
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35, 0)
+
 def next_journal_reference(conn, prefix="JRNL"):
-    """Generate next ref: PREFIX-YYYY-000001 style using journal_headers table."""
-    cur = conn.cursor()
+    """Generate next ref: PREFIX-YYYY-000001 style from the journal_sequences counter.
+    Call inside the posting transaction so the number is only consumed if the journal commits."""
     year = datetime.now().year
-    cur.execute("SELECT MAX(id) FROM journal_headers")
-    r = cur.fetchone()
-    seq = (r[0] or 0) + 1
+    if _HAS_RETURNING:
+        seq = conn.execute(_NEXT_SEQ_SQL + " RETURNING seq", (prefix, year)).fetchone()[0]
+    else:
+        conn.execute(_NEXT_SEQ_SQL, (prefix, year))
+        seq = conn.execute("SELECT seq FROM journal_sequences WHERE prefix = ? AND year = ?",
+                           (prefix, year)).fetchone()[0]
     return f"{prefix}-{year}-{seq:06d}"
 
 # ---------------------------
 # Posting helpers for integration
 # ---------------------------
-def post_manual_journal(journal_date, description, lines, journal_type="GJ", reference=None):
+def post_manual_journal(journal_date, description, lines, journal_type="GJ", reference=None, conn=None):
     """
     Post a general journal.
     lines: list of dict {gl_account_id: int, debit: float, credit: float, line_description: str}
     Ensures totals balance before posting.
+    conn: optional open connection; the caller then owns the transaction and the commit.
+    Without one the journal is posted as one transaction on the pool's writer.
     Returns inserted header id.
     """
-    total_debits = sum(float(l.get("debit", 0) or 0) for l in lines)
-    total_credits = sum(float(l.get("credit", 0) or 0) for l in lines)
-    if round(total_debits, 2) != round(total_credits, 2):
+    debit_cents = sum(_cents(l.get("debit")) for l in lines)
+    credit_cents = sum(_cents(l.get("credit")) for l in lines)
+    total_debits = debit_cents / 100
+    total_credits = credit_cents / 100
+    if debit_cents != credit_cents:
         raise ValueError(f"Journal not balanced (Debits {total_debits:.2f} != Credits {total_credits:.2f})")
 
-    conn = get_conn()
+    if conn is None:
+        with _journal_pool().write() as conn:
+            return post_manual_journal(journal_date, description, lines, journal_type, reference, conn=conn)
+
+    if not conn.in_transaction:
+        # take the write lock up front so the reference and the inserts see the same state
+        conn.execute("BEGIN IMMEDIATE")
     cur = conn.cursor()
+    # every referenced account is checked with one set query
+    ids = {int(ln["gl_account_id"]) for ln in lines}
+    if ids:
+        found = {r[0] for r in cur.execute(
+            f"SELECT id FROM gl_accounts WHERE active = 1 AND id IN ({','.join('?' * len(ids))})",
+            list(ids))}
+        missing = sorted(ids - found)
+        if missing:
+            raise ValueError(f"Unknown or inactive GL account(s): {', '.join(map(str, missing))}")
     if not reference:
         reference = next_journal_reference(conn)
     cur.execute("""
@@ -129,17 +205,13 @@ def post_manual_journal(journal_date, description, lines, journal_type="GJ", ref
         VALUES (?, ?, ?, ?, ?, ?)
     """, (journal_date, reference, description, total_debits, total_credits, journal_type))
     header_id = cur.lastrowid
-    for ln in lines:
-        gl = ln["gl_account_id"]
-        d = float(ln.get("debit", 0) or 0)
-        c = float(ln.get("credit", 0) or 0)
-        narrative = ln.get("line_description") or ""
-        cur.execute("""
-            INSERT INTO journal_lines (header_id, gl_account_id, debit, credit, line_description)
-            VALUES (?, ?, ?, ?, ?)
-        """, (header_id, gl, d, c, narrative))
-    conn.commit()
-    conn.close()
+    rows = [(header_id, int(ln["gl_account_id"]), float(ln.get("debit", 0) or 0),
+             float(ln.get("credit", 0) or 0), ln.get("line_description") or "")
+            for ln in lines]
+    cur.executemany("""
+        INSERT INTO journal_lines (header_id, gl_account_id, debit, credit, line_description)
+        VALUES (?, ?, ?, ?, ?)
+    """, rows)
     return header_id
 
 def post_cashbook_transaction(cashbook_name, tx_date, amount, contra_gl_account_id, description="", is_receipt=True):
@@ -151,49 +223,238 @@ def post_cashbook_transaction(cashbook_name, tx_date, amount, contra_gl_account_
     - is_receipt: True => Receipt (bank debited), False => Payment (bank credited)
     Returns header_id.
     """
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT gl_account_id FROM cashbooks WHERE name = ?", (cashbook_name,))
-    row = cur.fetchone()
-    if not row:
-        conn.close()
-        raise ValueError(f"Cashbook '{cashbook_name}' not found.")
-    bank_gl = row[0]
-    lines = []
-    amt = float(amount)
-    if is_receipt:
-        # Debit bank, Credit contra
-        lines.append({"gl_account_id": bank_gl, "debit": amt, "credit": 0, "line_description": description})
-        lines.append({"gl_account_id": contra_gl_account_id, "debit": 0, "credit": amt, "line_description": description})
-    else:
-        # Payment: Debit contra, Credit bank
-        lines.append({"gl_account_id": contra_gl_account_id, "debit": amt, "credit": 0, "line_description": description})
-        lines.append({"gl_account_id": bank_gl, "debit": 0, "credit": amt, "line_description": description})
-    header_id = post_manual_journal(tx_date, f"Cashbook post: {description}", lines, journal_type="CB")
-    conn.close()
-    return header_id
+    with _journal_pool().write() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT gl_account_id FROM cashbooks WHERE name = ?", (cashbook_name,))
+        row = cur.fetchone()
+        if not row:
+            raise ValueError(f"Cashbook '{cashbook_name}' not found.")
+        bank_gl = row[0]
+        lines = []
+        amt = float(amount)
+        if is_receipt:
+            # Debit bank, Credit contra
+            lines.append({"gl_account_id": bank_gl, "debit": amt, "credit": 0, "line_description": description})
+            lines.append({"gl_account_id": contra_gl_account_id, "debit": 0, "credit": amt, "line_description": description})
+        else:
+            # Payment: Debit contra, Credit bank
+            lines.append({"gl_account_id": contra_gl_account_id, "debit": amt, "credit": 0, "line_description": description})
+            lines.append({"gl_account_id": bank_gl, "debit": 0, "credit": amt, "line_description": description})
+        return post_manual_journal(tx_date, f"Cashbook post: {description}", lines, journal_type="CB", conn=conn)
 
 def create_reversing_journal(original_header_id, reversal_date=None):
     """Create a reversing journal that swaps debit/credit for each line."""
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT journal_date, description FROM journal_headers WHERE id = ?", (original_header_id,))
-    row = cur.fetchone()
-    if not row:
-        conn.close()
-        raise ValueError("Original journal not found")
-    orig_date, orig_desc = row
-    cur.execute("SELECT gl_account_id, debit, credit, line_description FROM journal_lines WHERE header_id = ?", (original_header_id,))
-    lines = []
-    for r in cur.fetchall():
-        gl, d, c, narr = r
-        # swap
-        lines.append({"gl_account_id": gl, "debit": float(c), "credit": float(d), "line_description": f"Reversal: {narr}"})
-    rev_date = reversal_date or datetime.now().strftime("%Y-%m-%d")
-    rev_ref = next_journal_reference(conn).replace("JRNL", "REV")
-    hid = post_manual_journal(rev_date, f"Reversal of {orig_desc}", lines, journal_type="RV", reference=rev_ref)
-    conn.close()
-    return hid
+    # the original is read and the reversal written under one write lock
+    with _journal_pool().write() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT journal_date, description FROM journal_headers WHERE id = ?", (original_header_id,))
+        row = cur.fetchone()
+        if not row:
+            raise ValueError("Original journal not found")
+        orig_date, orig_desc = row
+        cur.execute("SELECT gl_account_id, debit, credit, line_description FROM journal_lines WHERE header_id = ?", (original_header_id,))
+        # swap debit and credit; REAL columns already arrive as floats
+        lines = [{"gl_account_id": gl, "debit": c or 0.0, "credit": d or 0.0,
+                  "line_description": "Reversal: " + (narr or "")}
+                 for gl, d, c, narr in cur.fetchall()]
+        rev_date = reversal_date or datetime.now().strftime("%Y-%m-%d")
+        rev_ref = next_journal_reference(conn, prefix="REV")
+        return post_manual_journal(rev_date, f"Reversal of {orig_desc}", lines, journal_type="RV",
+                                   reference=rev_ref, conn=conn)
+
+def fetch_journal_page(offset=0, limit=200, after_id=None):
+    """
+    One page of journal headers, newest first, for a browse view.
+    Pass the last id of the previous page as after_id to seek on the rowid
+    (cost independent of depth); otherwise OFFSET is used.
+    Returns sqlite3.Row objects.
+    """
+    with _journal_pool().read() as conn:
+        if after_id is not None:
+            return conn.execute("""
+                SELECT id, journal_date, reference, description, total_debits, total_credits, journal_type
+                FROM journal_headers WHERE id < ? ORDER BY id DESC LIMIT ?
+            """, (after_id, limit)).fetchall()
+        return conn.execute("""
+            SELECT id, journal_date, reference, description, total_debits, total_credits, journal_type
+            FROM journal_headers ORDER BY id DESC LIMIT ? OFFSET ?
+        """, (limit, offset)).fetchall()
+
+# ---------------------------
+# Journal lines model + editors
+# ---------------------------
+LINE_HEADERS = ["Account", "Debit", "Credit", "Line Description", ""]
+COL_ACCOUNT, COL_DEBIT, COL_CREDIT, COL_DESC, COL_REMOVE = range(5)
+_LINE_KEYS = {COL_ACCOUNT: "gl_account_id", COL_DEBIT: "debit", COL_CREDIT: "credit", COL_DESC: "line_description"}
+
+class JournalLinesModel(QAbstractTableModel):
+    """Journal lines as plain dicts; editors only exist while a cell is being edited."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._rows = []
+        self.account_map = {}
+        # running sums in cents, adjusted by the change on every edit, insert and removal
+        self.debit_cents = 0
+        self.credit_cents = 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(LINE_HEADERS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, col = self._rows[index.row()], index.column()
+        if role == Qt.ItemDataRole.EditRole and col in _LINE_KEYS:
+            return row[_LINE_KEYS[col]]
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == COL_ACCOUNT:
+                return self.account_map.get(row["gl_account_id"], "")
+            if col in (COL_DEBIT, COL_CREDIT):
+                return format_currency(row[_LINE_KEYS[col]])
+            if col == COL_DESC:
+                return row["line_description"]
+            return "X"
+        if role == Qt.ItemDataRole.TextAlignmentRole and col in (COL_DEBIT, COL_CREDIT):
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole or index.column() not in _LINE_KEYS:
+            return False
+        key = _LINE_KEYS[index.column()]
+        row = self._rows[index.row()]
+        if key == "debit":
+            value = float(value or 0)
+            self.debit_cents += _cents(value) - _cents(row["debit"])
+        elif key == "credit":
+            value = float(value or 0)
+            self.credit_cents += _cents(value) - _cents(row["credit"])
+        row[key] = value
+        self.dataChanged.emit(index, index)
+        return True
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.isValid() and index.column() in _LINE_KEYS:
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return LINE_HEADERS[section]
+        return None
+
+    @staticmethod
+    def make_line(gl_id, debit=0.0, credit=0.0, line_desc=""):
+        return {"gl_account_id": gl_id, "debit": float(debit or 0),
+                "credit": float(credit or 0), "line_description": line_desc or ""}
+
+    def append_line(self, gl_id, debit, credit, line_desc):
+        r = len(self._rows)
+        line = self.make_line(gl_id, debit, credit, line_desc)
+        self.debit_cents += _cents(line["debit"])
+        self.credit_cents += _cents(line["credit"])
+        self.beginInsertRows(QModelIndex(), r, r)
+        self._rows.append(line)
+        self.endInsertRows()
+
+    def remove_line(self, r):
+        if 0 <= r < len(self._rows):
+            self.debit_cents -= _cents(self._rows[r]["debit"])
+            self.credit_cents -= _cents(self._rows[r]["credit"])
+            self.beginRemoveRows(QModelIndex(), r, r)
+            del self._rows[r]
+            self.endRemoveRows()
+
+    def set_lines(self, lines):
+        """Replaces every line in one reset, so views and totals refresh once."""
+        self.beginResetModel()
+        self._rows = list(lines)
+        self.debit_cents = sum(_cents(ln["debit"]) for ln in self._rows)
+        self.credit_cents = sum(_cents(ln["credit"]) for ln in self._rows)
+        self.endResetModel()
+
+    def clear(self):
+        self.set_lines([])
+
+    def rows(self):
+        return self._rows
+
+
+class AccountDelegate(QStyledItemDelegate):
+    """Account picker created only while the account cell is being edited.
+    Every editor shares one item model built when the accounts are loaded."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.account_model = QStandardItemModel(self)
+        self._id_to_row = {}
+
+    def set_accounts(self, accounts):
+        self.account_model.clear()
+        for aid, label in accounts:
+            item = QStandardItem(label)
+            item.setData(aid, Qt.ItemDataRole.UserRole)
+            self.account_model.appendRow(item)
+        self._id_to_row = {aid: i for i, (aid, _) in enumerate(accounts)}
+
+    def createEditor(self, parent, option, index):
+        cb = QComboBox(parent)
+        cb.setModel(self.account_model)
+        return cb
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentIndex(self._id_to_row.get(index.data(Qt.ItemDataRole.EditRole), 0))
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentData())
+
+
+class AmountDelegate(QStyledItemDelegate):
+    def createEditor(self, parent, option, index):
+        spin = QDoubleSpinBox(parent)
+        spin.setRange(-1e12, 1e12)
+        spin.setDecimals(2)
+        return spin
+
+    def setEditorData(self, editor, index):
+        editor.setValue(float(index.data(Qt.ItemDataRole.EditRole) or 0))
+
+    def setModelData(self, editor, model, index):
+        editor.interpretText()
+        model.setData(index, editor.value())
+
+# ---------------------------
+# Posting worker
+# ---------------------------
+class PostSignals(QObject):
+    finished = pyqtSignal(int)  # header id
+    error = pyqtSignal(str)
+
+
+class PostJournalTask(QRunnable):
+    """Posts a journal on the pool's writer off the UI thread."""
+
+    def __init__(self, journal_date, description, lines, reference, signals):
+        super().__init__()
+        self.journal_date = journal_date
+        self.description = description
+        self.lines = lines
+        self.reference = reference
+        self.signals = signals
+
+    def run(self):
+        try:
+            header_id = post_manual_journal(self.journal_date, self.description, self.lines,
+                                            journal_type="GJ", reference=self.reference)
+        except Exception as e:
+            self.signals.error.emit(str(e))
+            return
+        self.signals.finished.emit(header_id)
 
 # ---------------------------
 # Journal Tab UI
@@ -202,6 +463,11 @@ class JournalTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.account_map = {}  # gl_account_id -> "account_number - name"
+        self.accounts = []
+        self._post_signals = PostSignals(self)
+        self._post_signals.finished.connect(self._on_saved)
+        self._post_signals.error.connect(self._on_save_failed)
+        self._posting = False  # a PostJournalTask is in flight; Save stays off and the lines are locked
         self.setup_ui()
         self.load_gl_accounts()
         self.add_line()  # start with one line
@@ -230,12 +496,22 @@ class JournalTab(QWidget):
         self.layout().addLayout(top)
 
         # Table for lines
-        self.tbl = QTableWidget()
-        self.tbl.setColumnCount(5)
-        self.tbl.setHorizontalHeaderLabels(["Account", "Debit", "Credit", "Line Description", ""])
+        self.model = JournalLinesModel(self)
+        self.tbl = QTableView()
+        self.tbl.setModel(self.model)
+        self.account_delegate = AccountDelegate(self.tbl)
+        self.amount_delegate = AmountDelegate(self.tbl)
+        self.tbl.setItemDelegateForColumn(COL_ACCOUNT, self.account_delegate)
+        self.tbl.setItemDelegateForColumn(COL_DEBIT, self.amount_delegate)
+        self.tbl.setItemDelegateForColumn(COL_CREDIT, self.amount_delegate)
+        self.tbl.setEditTriggers(QTableView.EditTrigger.DoubleClicked | QTableView.EditTrigger.SelectedClicked
+                                 | QTableView.EditTrigger.EditKeyPressed | QTableView.EditTrigger.AnyKeyPressed)
         self.tbl.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
         self.tbl.setAlternatingRowColors(True)
+        self.tbl.clicked.connect(self._on_cell_clicked)
         self.layout().addWidget(self.tbl, 1)
+        for signal in (self.model.dataChanged, self.model.rowsInserted, self.model.rowsRemoved, self.model.modelReset):
+            signal.connect(lambda *_: self.recalculate_totals())
 
         # Bottom controls: add line, totals, save
         bottom = QHBoxLayout()
@@ -264,100 +540,56 @@ class JournalTab(QWidget):
 
     def load_gl_accounts(self):
         """Load GL accounts into a list for the account combo boxes."""
-        conn = get_conn()
-        cur = conn.cursor()
-        cur.execute("SELECT id, account_number, name FROM gl_accounts WHERE active = 1 ORDER BY account_number")
-        rows = cur.fetchall()
-        self.accounts = [(r[0], f"{r[1]} - {r[2]}") for r in rows]
-        self.account_map = {r[0]: f"{r[1]} - {r[2]}" for r in rows}
-        conn.close()
+        with _journal_pool().read() as conn:
+            # SQLite builds the label; the list and the dict share the same strings
+            rows = conn.execute(
+                "SELECT id, account_number || ' - ' || name AS label FROM gl_accounts "
+                "WHERE active = 1 ORDER BY account_number"
+            ).fetchall()
+        self.accounts = [(r["id"], r["label"]) for r in rows]
+        self.account_map = dict(self.accounts)
+        self.account_delegate.set_accounts(self.accounts)
+        self.model.account_map = self.account_map
+
+    def _default_account(self, gl_id=None):
+        # a new line starts on the first account, as the old combo box did
+        if not gl_id and self.accounts:
+            gl_id = self.accounts[0][0]
+        return gl_id or None
 
     def add_line(self, gl_id=None, debit=0.0, credit=0.0, line_desc=""):
-        row = self.tbl.rowCount()
-        self.tbl.insertRow(row)
-
-        # Account Combo
-        cb = QComboBox()
-        for aid, label in self.accounts:
-            cb.addItem(label, aid)
-        if gl_id:
-            # try to set index to matching gl_id
-            idx = next((i for i, (a,_) in enumerate(self.accounts) if a == gl_id), 0)
-            cb.setCurrentIndex(idx)
-        self.tbl.setCellWidget(row, 0, cb)
-
-        # Debit spin
-        dspin = QDoubleSpinBox()
-        dspin.setRange(-1e12, 1e12)
-        dspin.setDecimals(2)
-        dspin.setValue(float(debit or 0))
-        dspin.valueChanged.connect(self.recalculate_totals)
-        self.tbl.setCellWidget(row, 1, dspin)
-
-        # Credit spin
-        cspin = QDoubleSpinBox()
-        cspin.setRange(-1e12, 1e12)
-        cspin.setDecimals(2)
-        cspin.setValue(float(credit or 0))
-        cspin.valueChanged.connect(self.recalculate_totals)
-        self.tbl.setCellWidget(row, 2, cspin)
-
-        # Line description
-        ldesc = QLineEdit()
-        ldesc.setText(line_desc or "")
-        self.tbl.setCellWidget(row, 3, ldesc)
-
-        # Remove button / handle
-        btn = QPushButton("X")
-        btn.clicked.connect(lambda _, r=row: self.remove_row(r))
-        self.tbl.setCellWidget(row, 4, btn)
-
-        self.recalculate_totals()
+        self.model.append_line(self._default_account(gl_id), debit, credit, line_desc)
+
+    def load_lines(self, lines):
+        """Fills the grid with (gl_id, debit, credit, line_desc) tuples as one model reset."""
+        make = JournalLinesModel.make_line
+        self.model.set_lines([make(self._default_account(gl), d, c, desc) for gl, d, c, desc in lines])
+
+    def _on_cell_clicked(self, index):
+        if index.column() == COL_REMOVE:
+            self.remove_row(index.row())
 
     def remove_row(self, row_idx):
-        # Removing by index: safer to find actual row index for the widget because lambda binds early
-        # We'll remove currently selected row if index out of range
-        if row_idx >= self.tbl.rowCount() or row_idx < 0:
-            sel = self.tbl.currentRow()
-            if sel >= 0:
-                self.tbl.removeRow(sel)
-        else:
-            # find the current count and remove that row
-            try:
-                self.tbl.removeRow(row_idx)
-            except Exception:
-                # fallback
-                sel = self.tbl.currentRow()
-                if sel >= 0:
-                    self.tbl.removeRow(sel)
-        self.recalculate_totals()
+        self.model.remove_line(row_idx)
 
     def remove_selected(self):
-        sel = self.tbl.currentRow()
+        sel = self.tbl.currentIndex().row()
         if sel >= 0:
-            self.tbl.removeRow(sel)
-            self.recalculate_totals()
+            self.model.remove_line(sel)
         else:
             QMessageBox.information(self, "Remove", "Select a row to remove.")
 
     def recalculate_totals(self):
-        total_debit = 0.0
-        total_credit = 0.0
-        for r in range(self.tbl.rowCount()):
-            dspin = self.tbl.cellWidget(r, 1)
-            cspin = self.tbl.cellWidget(r, 2)
-            d = float(dspin.value() if dspin else 0)
-            c = float(cspin.value() if cspin else 0)
-            total_debit += d
-            total_credit += c
-        self.debit_total_lbl.setText(f"Debits: {format_currency(total_debit)}")
-        self.credit_total_lbl.setText(f"Credits: {format_currency(total_credit)}")
+        debit_cents = self.model.debit_cents
+        credit_cents = self.model.credit_cents
+        self.debit_total_lbl.setText(f"Debits: {format_currency(debit_cents / 100)}")
+        self.credit_total_lbl.setText(f"Credits: {format_currency(credit_cents / 100)}")
         # Visual cue
-        if round(total_debit, 2) == round(total_credit, 2) and total_debit != 0:
+        if debit_cents == credit_cents and debit_cents != 0:
             self.status_lbl.setText("<font color='green'><b>Balanced</b></font>")
-            self.btn_save.setEnabled(True)
+            self.btn_save.setEnabled(not self._posting)
         else:
-            if total_debit == 0 and total_credit == 0:
+            if debit_cents == 0 and credit_cents == 0:
                 self.status_lbl.setText("")
             else:
                 self.status_lbl.setText("<font color='red'><b>Not Balanced</b></font>")
@@ -365,34 +597,28 @@ class JournalTab(QWidget):
 
     def collect_lines(self):
         lines = []
-        for r in range(self.tbl.rowCount()):
-            cb = self.tbl.cellWidget(r, 0)
-            dspin = self.tbl.cellWidget(r, 1)
-            cspin = self.tbl.cellWidget(r, 2)
-            ldesc = self.tbl.cellWidget(r, 3)
-            if cb is None:
+        for ln in self.model.rows():
+            if ln["gl_account_id"] is None:
                 continue
-            gl_id = cb.currentData()
-            debit = float(dspin.value() if dspin else 0)
-            credit = float(cspin.value() if cspin else 0)
-            if round(debit, 2) == 0 and round(credit, 2) == 0:
+            debit, credit = ln["debit"], ln["credit"]
+            if _cents(debit) == 0 and _cents(credit) == 0:
                 continue  # skip empty lines
             lines.append({
-                "gl_account_id": int(gl_id),
+                "gl_account_id": int(ln["gl_account_id"]),
                 "debit": debit,
                 "credit": credit,
-                "line_description": ldesc.text() if ldesc else ""
+                "line_description": ln["line_description"]
             })
         return lines
 
     def save_journal(self):
+        if self._posting:
+            return
         lines = self.collect_lines()
         if not lines:
             QMessageBox.warning(self, "Empty", "Journal has no lines.")
             return
-        total_debits = sum(l["debit"] for l in lines)
-        total_credits = sum(l["credit"] for l in lines)
-        if round(total_debits, 2) != round(total_credits, 2):
+        if sum(_cents(l["debit"]) for l in lines) != sum(_cents(l["credit"]) for l in lines):
             QMessageBox.critical(self, "Unbalanced", "Journal is not balanced. Debits must equal Credits.")
             return
 
@@ -400,17 +626,31 @@ class JournalTab(QWidget):
         description = self.desc_edit.text().strip()
         reference = self.ref_edit.text().strip() or None
 
-        try:
-            header_id = post_manual_journal(date_s, description, lines, journal_type="GJ", reference=reference)
-            QMessageBox.information(self, "Saved", f"Journal saved (ID {header_id}).")
-            # reset UI
-            self.tbl.setRowCount(0)
-            self.add_line()
-            self.ref_edit.clear()
-            self.desc_edit.clear()
-            self.recalculate_totals()
-        except Exception as e:
-            QMessageBox.critical(self, "Error", str(e))
+        # the insert (and any WAL checkpoint it triggers) runs off the UI thread
+        self._set_posting(True)
+        QThreadPool.globalInstance().start(
+            PostJournalTask(date_s, description, lines, reference, self._post_signals))
+
+    def _set_posting(self, posting):
+        # the posted lines were snapshotted; edits made now would be lost or posted twice
+        self._posting = posting
+        for w in (self.tbl, self.btn_add, self.btn_remove, self.date_edit, self.ref_edit, self.desc_edit):
+            w.setEnabled(not posting)
+        if posting:
+            self.btn_save.setEnabled(False)
+
+    def _on_saved(self, header_id):
+        QMessageBox.information(self, "Saved", f"Journal saved (ID {header_id}).")
+        self._set_posting(False)
+        # reset UI: one model reset leaves a blank line and refreshes the totals once
+        self.load_lines([(None, 0.0, 0.0, "")])
+        self.ref_edit.clear()
+        self.desc_edit.clear()
+
+    def _on_save_failed(self, message):
+        QMessageBox.critical(self, "Error", message)
+        self._set_posting(False)
+        self.recalculate_totals()  # re-enables Save if the lines still balance
 
 # ---------------------------
 # Integration helper & test-run
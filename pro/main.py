@@ -15,7 +15,7 @@ from PyQt6.QtWidgets import (
     QDialog, QDialogButtonBox, QLineEdit, QInputDialog, QRadioButton,
     QFileDialog
 )
-from PyQt6.QtCore import Qt, QSize, QDate
+from PyQt6.QtCore import Qt, QSize, QDate, QTimer
 from PyQt6.QtGui import QIcon
 
 from pro.customers_tab import CustomersTab
@@ -52,6 +52,12 @@ except Exception:
 # ========================
 ICONS_DIR = Path(__file__).parent.parent / "icons"
 
+def apply_app_style():
+    """Sets the theme stylesheet once on the application; every window and dialog inherits it."""
+    app = QApplication.instance()
+    if app:
+        app.setStyleSheet(get_widget_style())
+
 def icon(name: str) -> QIcon:
     p = ICONS_DIR / name
     if p.exists():
@@ -67,7 +73,6 @@ class LoginDialog(QDialog):
         super().__init__()
         self.setWindowTitle("NexLedger Pro – Login")
         self.setFixedSize(420, 340)
-        self.setStyleSheet(get_widget_style())
 
         lay = QVBoxLayout(self)
         lay.setSpacing(15)
@@ -114,7 +119,6 @@ class CompanySelector(QDialog):
         super().__init__(parent)
         self.setWindowTitle("Select Company")
         self.setFixedSize(500, 500)
-        self.setStyleSheet(get_widget_style())
 
         layout = QVBoxLayout(self)
         layout.setContentsMargins(30, 30, 30, 30)
@@ -166,7 +170,6 @@ class CompanySelector(QDialog):
         dialog = QDialog(self)
         dialog.setWindowTitle("Create Company")
         dialog.setFixedSize(500, 300)
-        dialog.setStyleSheet(get_widget_style())
         lay = QVBoxLayout(dialog)
         lay.setContentsMargins(30, 30, 30, 30)
 
@@ -203,7 +206,7 @@ class CompanySelector(QDialog):
                 QMessageBox.critical(self, "Error", str(e))
                 return
         else:
-            wizard = CompanySetupWizard(self)
+            wizard = CompanySetupWizard(self, main_window=self.parent())
             if wizard.exec() != QDialog.DialogCode.Accepted:
                 return
         self.refresh_companies()
@@ -250,6 +253,12 @@ class NexLedgerPro(QMainWindow):
         self.setGeometry(100, 100, 1400, 800)
         self.sidebar_collapsed = True
 
+        # coalesces refresh requests fired in quick succession into one refresh_all()
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(0)
+        self._refresh_timer.timeout.connect(self.refresh_all)
+
         central = QWidget()
         self.setCentralWidget(central)
         self.main_layout = QVBoxLayout(central)
@@ -261,8 +270,6 @@ class NexLedgerPro(QMainWindow):
         self.content_area = QHBoxLayout()
         self.main_layout.addLayout(self.content_area, 1)
 
-        self.setStyleSheet(get_widget_style())
-
     def build_menu_bar(self):
         menubar = self.menuBar()
         menubar.setStyleSheet("""
@@ -390,7 +397,7 @@ class NexLedgerPro(QMainWindow):
     def import_bank_csv(self):
         if hasattr(self, 'tabs') and self.tabs.count() > 6:
             try:
-                tab = self.tabs.widget(6)
+                tab = self._tab_widget(6)
                 if hasattr(tab, 'import_csv'):
                     tab.import_csv()
                     return
@@ -494,7 +501,7 @@ class NexLedgerPro(QMainWindow):
     def toggle_theme(self, state):
         is_dark = state == Qt.CheckState.Checked.value
         set_dark_mode(is_dark)
-        self.setStyleSheet(get_widget_style())
+        apply_app_style()
         # keep checkbox synced
         try:
             self.dark_cb.blockSignals(True)
@@ -540,7 +547,6 @@ class NexLedgerPro(QMainWindow):
     def build_sidebar(self):
         self.sidebar = QFrame()
         self.sidebar.setFixedWidth(230 if not self.sidebar_collapsed else 0)
-        self.sidebar.setStyleSheet(get_widget_style())
         lay = QVBoxLayout(self.sidebar)
         lay.setContentsMargins(10, 15, 10, 15)
         lay.setSpacing(12)
@@ -563,14 +569,16 @@ class NexLedgerPro(QMainWindow):
         ]
 
         self.side_buttons = []
+        self._side_labels = []  # expanded text per button, parallel to side_buttons
         for txt, ico, func in items:
-            b = QPushButton(f"  {txt}" if not self.sidebar_collapsed else "")
+            label = f"  {txt}"
+            b = QPushButton(label if not self.sidebar_collapsed else "")
             b.setIcon(icon(ico))
             b.setIconSize(QSize(24, 24))
-            b.setProperty("txt", f"  {txt}")
             b.clicked.connect(func)
             lay.addWidget(b)
             self.side_buttons.append(b)
+            self._side_labels.append(label)
         lay.addStretch()
         self.content_area.addWidget(self.sidebar)
 
@@ -633,18 +641,53 @@ class NexLedgerPro(QMainWindow):
             (self.create_help, "Help", "help.svg", "Help and about"),
         ]
 
+        # only the first tab is built now; the rest are placeholders until first shown
+        self._tab_factories = {}
         for builder, title, ico_name, tooltip in tab_builders:
-            try:
-                widget = builder()
-            except Exception as e:
+            if self.tabs.count() == 0:
+                widget = self._build_tab(builder, title)
+            else:
                 widget = QWidget()
-                lay = QVBoxLayout(widget)
-                lay.setContentsMargins(20, 20, 20, 20)
-                lbl = QLabel(f"<h3>{title}</h3><p>Failed to initialize tab: {e}</p>")
-                lay.addWidget(lbl)
-            ico = icon(ico_name)
-            idx = self.tabs.addTab(widget, ico, title)
+            idx = self.tabs.addTab(widget, icon(ico_name), title)
             self.tabs.setTabToolTip(idx, tooltip)
+            if idx > 0:
+                self._tab_factories[idx] = builder
+        self.tabs.currentChanged.connect(self._ensure_tab)
+
+    def _build_tab(self, builder, title):
+        try:
+            return builder()
+        except Exception as e:
+            widget = QWidget()
+            lay = QVBoxLayout(widget)
+            lay.setContentsMargins(20, 20, 20, 20)
+            lbl = QLabel(f"<h3>{title}</h3><p>Failed to initialize tab: {e}</p>")
+            lay.addWidget(lbl)
+            return widget
+
+    def _ensure_tab(self, idx):
+        builder = self._tab_factories.pop(idx, None)
+        if builder is None:
+            return
+        title = self.tabs.tabText(idx)
+        ico = self.tabs.tabIcon(idx)
+        tooltip = self.tabs.tabToolTip(idx)
+        widget = self._build_tab(builder, title)
+        placeholder = self.tabs.widget(idx)
+        current = self.tabs.currentIndex()
+        # swapping the page would move the current index; keep that from re-entering here
+        self.tabs.blockSignals(True)
+        self.tabs.removeTab(idx)
+        self.tabs.insertTab(idx, widget, ico, title)
+        self.tabs.setTabToolTip(idx, tooltip)
+        self.tabs.setCurrentIndex(current)
+        self.tabs.blockSignals(False)
+        placeholder.deleteLater()
+
+    def _tab_widget(self, idx):
+        # menu actions can reach a tab before it was shown; build it first
+        self._ensure_tab(idx)
+        return self.tabs.widget(idx)
 
     # Tab builders
     def create_dashboard(self):
@@ -656,17 +699,6 @@ class NexLedgerPro(QMainWindow):
             v.addWidget(QLabel("<h2>Dashboard</h2>"))
             return w
 
-    def load_customers(self):
-        try:
-            conn = get_conn()
-            rows = conn.execute("SELECT id, name, email, phone FROM customers").fetchall()
-            self.cust_table.setRowCount(len(rows))
-            for r, row in enumerate(rows):
-                for c, val in enumerate(row):
-                    self.cust_table.setItem(r, c, QTableWidgetItem(str(val or "")))
-        except Exception as e:
-            print("Load customers error:", e)
-
     def create_vendors(self):
         w = QWidget()
         v = QVBoxLayout(w)
@@ -772,8 +804,13 @@ class NexLedgerPro(QMainWindow):
             self.sidebar.setFixedWidth(w)
         if hasattr(self, 'sidebar_btn'):
             self.sidebar_btn.setText("Expand" if self.sidebar_collapsed else "Collapse")
-        for b in getattr(self, 'side_buttons', []):
-            b.setText("" if self.sidebar_collapsed else b.property("txt"))
+        if not hasattr(self, 'sidebar'):
+            return
+        # one repaint for the whole relabel
+        self.sidebar.setUpdatesEnabled(False)
+        for b, label in zip(self.side_buttons, self._side_labels):
+            b.setText("" if self.sidebar_collapsed else label)
+        self.sidebar.setUpdatesEnabled(True)
 
     def show_dashboard(self):
         self.tabs.setCurrentIndex(0)
@@ -784,8 +821,13 @@ class NexLedgerPro(QMainWindow):
     def show_general_ledger(self):
         self.tabs.setCurrentIndex(8)
 
+    def schedule_refresh(self):
+        self._refresh_timer.start()
+
     def refresh_all(self):
         for i in range(self.tabs.count()):
+            if i in getattr(self, '_tab_factories', {}):
+                continue  # not built yet; it loads fresh data when first shown
             tab = self.tabs.widget(i)
             if hasattr(tab, 'refresh_data'):
                 try:
@@ -801,7 +843,9 @@ class NexLedgerPro(QMainWindow):
     def _get_cashbook_tab(self):
         # Attempt to find CashBookTab instance if present
         for i in range(self.tabs.count()):
-            t = self.tabs.widget(i)
+            if self.tabs.tabText(i) != "Cash Book":
+                continue
+            t = self._tab_widget(i)
             if isinstance(t, CashBookTab):
                 return t
         return None
@@ -827,5 +871,6 @@ def show_login_flow():
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     app.setStyle("Fusion")
+    apply_app_style()
     show_login_flow()
     sys.exit(app.exec())
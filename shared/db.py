@@ -3,6 +3,8 @@ import sqlite3
 import json
 import re
 import shutil
+import queue
+import threading
 from pathlib import Path
 from datetime import datetime
 from contextlib import contextmanager
@@ -12,6 +14,11 @@ COMPANIES_DIR = ROOT_DIR / "companies"
 SETTINGS_FILE = ROOT_DIR / "settings.json"
 
 _CURRENT_COMPANY = None  # active company name
+_POOLS = {}  # db path -> ConnPool
+_POOLS_LOCK = threading.Lock()
+_TABLE_CACHE: dict[tuple, bool] = {}  # (company, table) -> exists
+_WAL_READY: set[str] = set()  # db paths already switched to WAL (persists in the file)
+_CLOSE_HOOKS = []  # callables that drop per-database caches kept outside this module
 
 
 # ─────────────────────────────────────────────────────────────
@@ -28,7 +35,21 @@ def sanitize_company_name(name: str) -> str:
 
 
 def close_all_dbs():
-    pass  # kept for backwards compatibility
+    """Closes every pooled connection (e.g. before a company folder is removed)."""
+    with _POOLS_LOCK:
+        pools = list(_POOLS.values())
+        _POOLS.clear()
+    for pool in pools:
+        pool.close()
+    # a database deleted and recreated under the same path starts from scratch
+    _WAL_READY.clear()
+    for hook in _CLOSE_HOOKS:
+        hook()
+
+
+def on_close_all_dbs(hook):
+    """Registers a no-argument callable to run after close_all_dbs() drops the pools."""
+    _CLOSE_HOOKS.append(hook)
 
 
 def set_current_company(name: str):
@@ -95,8 +116,14 @@ def db_connection():
 
     first_time = not db_path.exists()
 
-    conn = sqlite3.connect(db_path)
+    # same statement cache size as the pool, for callers that keep their connection
+    conn = sqlite3.connect(db_path, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    for pragma in _CONN_PRAGMAS:
+        conn.execute(pragma)
+    if str(db_path) not in _WAL_READY:
+        conn.execute("PRAGMA journal_mode=WAL")
+        _WAL_READY.add(str(db_path))
 
     if first_time or not _table_exists(conn, "company_info"):
         init_db_for_company(conn, get_current_company())
@@ -114,8 +141,14 @@ def get_conn():
 
     first_time = not db_path.exists()
 
-    conn = sqlite3.connect(db_path)
+    # same statement cache size as the pool, for callers that keep their connection
+    conn = sqlite3.connect(db_path, cached_statements=256)
     conn.row_factory = sqlite3.Row
+    for pragma in _CONN_PRAGMAS:
+        conn.execute(pragma)
+    if str(db_path) not in _WAL_READY:
+        conn.execute("PRAGMA journal_mode=WAL")
+        _WAL_READY.add(str(db_path))
 
     if first_time or not _table_exists(conn, "company_info"):
         init_db_for_company(conn, get_current_company())
@@ -130,6 +163,137 @@ def get_conn_safe():
         return None
 
 
+# ─────────────────────────────────────────────────────────────
+# CONNECTION POOL
+# ─────────────────────────────────────────────────────────────
+
+_CONN_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+)
+
+
+class ConnPool:
+    """
+    Process-wide connections for one company database: a single read/write
+    connection behind a lock plus a small queue of read-only connections.
+    Connections stay open for the life of the process so SQLite keeps its page
+    cache and prepared statements between UI actions.
+    """
+
+    def __init__(self, db_path: Path, company_name: str, readers: int = 4):
+        self.db_path = Path(db_path)
+        self._write_lock = threading.RLock()
+        self._writer = self._connect(self.db_path)
+        self._writer.execute("PRAGMA journal_mode=WAL")
+        if not _table_exists(self._writer, "company_info"):
+            init_db_for_company(self._writer, company_name)
+        self._max_readers = readers
+        self._reader_lock = threading.Lock()
+        self._created = 0
+        self._readers = queue.Queue()
+        self._closed = False
+
+    @staticmethod
+    def _connect(target, uri=False):
+        # check_same_thread=False: a pooled handle may be checked out by a worker
+        # thread; the pool guarantees only one user at a time. Shared-cache mode
+        # is not used - under WAL, private caches let readers run beside the writer.
+        conn = sqlite3.connect(target, uri=uri, check_same_thread=False, cached_statements=256)
+        conn.row_factory = sqlite3.Row
+        for pragma in _CONN_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def _take_reader(self):
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._reader_lock:
+            spawn = self._created < self._max_readers
+            if spawn:
+                self._created += 1
+        if spawn:
+            return self._connect(f"{self.db_path.resolve().as_uri()}?mode=ro", uri=True)
+        return self._readers.get()
+
+    @contextmanager
+    def read(self):
+        conn = self._take_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            if self._closed:
+                conn.close()
+            else:
+                self._readers.put(conn)
+
+    @contextmanager
+    def write(self):
+        """One explicit transaction on the writer: a single commit (and WAL sync) per block."""
+        with self._write_lock:
+            try:
+                if not self._writer.in_transaction:
+                    self._writer.execute("BEGIN IMMEDIATE")
+                yield self._writer
+                if self._writer.in_transaction:
+                    self._writer.commit()
+            except Exception:
+                if self._writer.in_transaction:
+                    self._writer.rollback()
+                raise
+
+    def fingerprint(self):
+        """
+        Cheap change marker for the database: size and mtime of the main file
+        and its WAL. Any commit appends to the WAL (or a checkpoint rewrites the
+        main file), so an unchanged fingerprint means unchanged data.
+        """
+        marks = []
+        for path in (self.db_path, self.db_path.with_name(self.db_path.name + "-wal")):
+            try:
+                st = path.stat()
+                marks.append((st.st_size, st.st_mtime_ns))
+            except OSError:
+                marks.append(None)
+        return tuple(marks)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._readers.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._write_lock:
+            self._writer.close()
+
+
+def get_pool():
+    """Returns the ConnPool for the active company, or None if no company is open."""
+    try:
+        require_company()
+        db_path = get_db_path()
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        key = str(db_path)
+        with _POOLS_LOCK:
+            pool = _POOLS.get(key)
+        if pool is None:
+            fresh = ConnPool(db_path, get_current_company())
+            with _POOLS_LOCK:
+                pool = _POOLS.setdefault(key, fresh)
+            if pool is not fresh:
+                fresh.close()
+        return pool
+    except Exception:
+        return None
+
+
 def _table_exists(conn, name):
     try:
         res = conn.execute(
@@ -141,6 +305,25 @@ def _table_exists(conn, name):
         return False
 
 
+def table_exists(conn, name):
+    """
+    Cached sqlite_master lookup for the active company. Tables are never dropped
+    at runtime, so only positive answers are remembered; a missing table is
+    re-checked until some migration creates it.
+    """
+    key = (get_current_company(), name)
+    if _TABLE_CACHE.get(key):
+        return True
+    exists = _table_exists(conn, name)
+    if exists:
+        _TABLE_CACHE[key] = True
+    return exists
+
+
+def invalidate_schema_cache():
+    _TABLE_CACHE.clear()
+
+
 def seed_chart_of_accounts(conn):
     """Creates a standard South African SME Chart of Accounts."""
 
@@ -413,6 +596,7 @@ def init_db_for_company(conn, company_name: str):
         amount REAL NOT NULL,
         type TEXT CHECK(type IN ('Income','Expense')),
         category_id INTEGER,
+        customer_id INTEGER,
         audit_user TEXT,
         audit_timestamp TEXT DEFAULT (datetime('now'))
     );
@@ -523,6 +707,8 @@ def init_db_for_company(conn, company_name: str):
     );
     """)
 
+    invalidate_schema_cache()
+
     clean = sanitize_company_name(company_name)
     cur.execute("INSERT OR IGNORE INTO company_info (id, name) VALUES (1, ?)", (clean,))
     cur.execute("INSERT OR IGNORE INTO vat_settings (id) VALUES (1)")
@@ -565,6 +751,8 @@ def create_company(name: str):
 
 def delete_company(name: str) -> bool:
     try:
+        close_all_dbs()
+        invalidate_schema_cache()
         shutil.rmtree(COMPANIES_DIR / name)
         if get_current_company() == name:
             global _CURRENT_COMPANY
@@ -11,7 +11,9 @@ Double-entry posting system for:
  - Trial Balance, P&L, Balance Sheet
 """
 
-from shared.db import db_connection, log_audit
+from contextlib import nullcontext
+
+from shared.db import db_connection, get_pool, log_audit
 
 
 # -----------------------------
@@ -237,9 +239,10 @@ def get_ledger(account_id, date_from=None, date_to=None):
         return ledger
 
 
-def trial_balance():
-    """Return a full trial balance grouped by account type."""
-    with db_connection() as conn:
+def trial_balance(conn=None):
+    """Return a full trial balance grouped by account type.
+    conn: optional open connection to read through instead of checking one out."""
+    with _read_connection(conn) as conn:
         cur = conn.cursor()
 
         accounts = cur.execute("SELECT id, code, name, type FROM accounts ORDER BY code").fetchall()
@@ -266,10 +269,10 @@ def trial_balance():
 # Financial Statements
 # -----------------------------
 
-def profit_and_loss():
+def profit_and_loss(conn=None):
     """Return P&L grouped as Income - COGS - Expenses."""
 
-    tb = trial_balance()
+    tb = trial_balance(conn)
 
     income = []
     cogs = []
@@ -299,9 +302,9 @@ def profit_and_loss():
     }
 
 
-def balance_sheet():
+def balance_sheet(conn=None):
     """Return Assets = Liabilities + Equity balance sheet."""
-    tb = trial_balance()
+    tb = trial_balance(conn)
 
     assets = []
     liabilities = []
@@ -329,10 +332,53 @@ def balance_sheet():
     }
 
 
+def dashboard_kpis(months=12, conn=None):
+    """
+    Return the dashboard headline figures in one pass over the journal:
+    bank balance (account 1000, all time) plus income, expenses and net
+    profit for the trailing `months`, grouped the same way as profit_and_loss().
+    conn: optional open connection to read through instead of checking one out.
+    """
+    with _read_connection(conn) as conn:
+        row = conn.execute("""
+            SELECT
+                TOTAL(l.debit - l.credit) FILTER (WHERE a.code = '1000') AS bank,
+                TOTAL(l.debit - l.credit) FILTER (
+                    WHERE a.type = 'Income' AND e.date >= date('now', :since)) AS income,
+                TOTAL(l.debit - l.credit) FILTER (
+                    WHERE a.type != 'Income' AND a.code LIKE '5%' AND e.date >= date('now', :since)) AS cogs,
+                TOTAL(l.debit - l.credit) FILTER (
+                    WHERE a.type = 'Expense' AND a.code NOT LIKE '5%' AND e.date >= date('now', :since)) AS expenses
+            FROM journal_lines l
+            JOIN accounts a ON a.id = l.account_id
+            LEFT JOIN journal_entries e ON e.id = l.journal_id
+        """, {"since": f"-{int(months)} months"}).fetchone()
+
+    income, cogs, expenses = row["income"], row["cogs"], row["expenses"]
+    return {
+        "bank_balance": row["bank"],
+        "total_income": income,
+        "total_expenses": expenses,
+        "net_profit": income - cogs - expenses
+    }
+
+
 # -----------------------------
 # Helpers
 # -----------------------------
 
+def _read_connection(conn=None):
+    """
+    The caller's connection when one is given (left open); otherwise a pooled
+    read-only connection when a company is open, so prepared statements stay in
+    its statement cache between dashboard refreshes, or a one-off connection.
+    """
+    if conn is not None:
+        return nullcontext(conn)
+    pool = get_pool()
+    return pool.read() if pool else db_connection()
+
+
 def _get_account_id(conn, code):
     row = conn.execute("SELECT id FROM accounts WHERE code = ?", (code,)).fetchone()
     if not row:
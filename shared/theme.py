@@ -11,12 +11,22 @@
 # - Dialogs, Wizards, Main Windows unified
 
 import json
+from functools import lru_cache
 from pathlib import Path
 
 ROOT_DIR = Path(__file__).parent.parent
 SETTINGS_FILE = ROOT_DIR / "settings.json"
 
+# read from settings.json once; set_dark_mode keeps it current afterwards
+_dark_mode = None
+
 def is_dark_mode() -> bool:
+    global _dark_mode
+    if _dark_mode is None:
+        _dark_mode = _read_dark_mode()
+    return _dark_mode
+
+def _read_dark_mode() -> bool:
     if not SETTINGS_FILE.exists():
         return False
     try:
@@ -34,6 +44,8 @@ def set_dark_mode(enabled: bool):
             pass
     data["dark_mode"] = bool(enabled)
     json.dump(data, open(SETTINGS_FILE, "w"), indent=2)
+    global _dark_mode
+    _dark_mode = bool(enabled)
 
 def toggle_dark_mode():
     set_dark_mode(not is_dark_mode())
@@ -56,7 +68,12 @@ SHADOW_LIGHT = "rgba(0,0,0,0.15)"
 # ------------------------------------------------------
 
 def get_widget_style() -> str:
-    if is_dark_mode():
+    return _style_for(is_dark_mode())
+
+@lru_cache(maxsize=2)
+def _style_for(dark: bool) -> str:
+    # one QSS string per theme, built once and reused by every caller
+    if dark:
         return f"""
             * {{ background: {DARK_BG}; color: #F6F6F6; font-family: 'Segoe UI'; }}
 